@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.services import advisor_service
+
+router = APIRouter()
+
+@router.get("/advisor/indexes")
+async def get_index_advice(
+    schema: Optional[str] = None,
+    table: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500),
+):
+    from app.utils.sql_safety import _validate_ident
+    if schema is not None:
+        _validate_ident(schema, "schema")
+    if table is not None:
+        _validate_ident(table, "table")
+    return await advisor_service.index_advice(schema, table, limit)
+
+@router.post("/advisor/indexes/reset")
+async def reset_index_advice(schema: Optional[str] = None, table: Optional[str] = None):
+    return {"reset": advisor_service.reset(schema, table)}
@@ -1,59 +1,120 @@
-from fastapi import APIRouter
-from app.services import metadata_service
+from typing import Optional
+from fastapi import APIRouter, Header
+from app.services import catalog_service, metadata_service
+from app.core import config
+from app.utils.http_cache import etag_matches, not_modified, weak_etag
+from app.utils.serialization import FastJSONResponse
+
+# Clients may store catalog responses but must revalidate them via ETag.
+CATALOG_CACHE_CONTROL = "private, no-cache"
 
 router = APIRouter()
 
+async def _catalog_response(if_none_match, fetch, kind: str, schema=None, table=None):
+    # The ETag comes from the catalog version, so a matching If-None-Match is
+    # answered without running the metadata query.
+    if not config.ETAG_ENABLED:
+        return FastJSONResponse(await fetch())
+    version = await metadata_service.get_catalog_version(schema, table)
+    etag = weak_etag((kind, schema, table, version))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+    response = FastJSONResponse(await fetch())
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+    return response
+
 @router.get("/metadata/schemas")
-async def get_metadata_schemas():
-    return await metadata_service.get_pg_schemas()
+async def get_metadata_schemas(if_none_match: Optional[str] = Header(None)):
+    return await _catalog_response(if_none_match, metadata_service.get_pg_schemas, "schemas")
 
 @router.get("/metadata/schemas/{schema}/tables")
-async def get_metadata_tables(schema: str):
+async def get_metadata_tables(schema: str, if_none_match: Optional[str] = Header(None)):
     # Validation logic was: _validate_ident(schema, "schema")
     # We should add that. Let's import from utils.
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_tables(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_tables(schema), "tables", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/views")
-async def get_metadata_views(schema: str):
+async def get_metadata_views(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_views(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_views(schema), "views", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/matviews")
-async def get_metadata_matviews(schema: str):
+async def get_metadata_matviews(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_matviews(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_matviews(schema), "matviews", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/indexes")
-async def get_metadata_indexes(schema: str):
+async def get_metadata_indexes(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_indexes(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_indexes(schema), "indexes", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/sequences")
-async def get_metadata_sequences(schema: str):
+async def get_metadata_sequences(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_sequences(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_sequences(schema), "sequences", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/datatypes")
-async def get_metadata_datatypes(schema: str):
+async def get_metadata_datatypes(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_datatypes(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_datatypes(schema), "datatypes", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/functions")
-async def get_metadata_functions(schema: str):
+async def get_metadata_functions(schema: str, if_none_match: Optional[str] = Header(None)):
+    from app.utils.sql_safety import _validate_ident
+    _validate_ident(schema, "schema")
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_functions(schema), "functions", schema
+    )
+
+@router.get("/metadata/schemas/{schema}/overview")
+async def get_metadata_overview(schema: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
-    return await metadata_service.get_pg_functions(schema)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_schema_overview(schema), "overview", schema
+    )
 
 @router.get("/metadata/schemas/{schema}/columns")
-async def get_metadata_columns(schema: str, table: str):
+async def get_metadata_columns(schema: str, table: str, if_none_match: Optional[str] = Header(None)):
     from app.utils.sql_safety import _validate_ident
     _validate_ident(schema, "schema")
     _validate_ident(table, "table")
-    return await metadata_service.get_pg_columns(schema, table)
+    return await _catalog_response(
+        if_none_match, lambda: metadata_service.get_pg_columns(schema, table), "columns", schema, table
+    )
+
+@router.get("/metadata/cache")
+async def get_metadata_cache_stats():
+    return catalog_service.cache_stats()
+
+@router.post("/metadata/cache/invalidate")
+async def invalidate_metadata_cache(schema: Optional[str] = None, table: Optional[str] = None):
+    from app.utils.sql_safety import _validate_ident
+    if schema is not None:
+        _validate_ident(schema, "schema")
+    if table is not None:
+        if schema is None:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=400, detail="table requires schema")
+        _validate_ident(table, "table")
+    return {"invalidated": catalog_service.invalidate(schema, table)}
@@ -1,26 +1,112 @@
-from fastapi import APIRouter, Body
-from app.models.schemas import QueryRequest, CancelRequest
-from app.services import query_service, cancel_service
+from typing import Optional
+from fastapi import APIRouter, Body, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from app.models.schemas import QueryRequest, ExplainRequest, JobRequest, CancelRequest, BulkCancelRequest, ExportQueryRequest
+from app.services import query_service, cancel_service, export_service, job_service, session_service
+from app.core import metrics
+from app.utils.arrow import wants_arrow
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 
 @router.post("/query")
-async def execute_query(request: QueryRequest):
-    return await query_service.execute_query_logic(
+async def execute_query(request: QueryRequest, accept: Optional[str] = Header(None)):
+    result = await query_service.execute_query_logic(
         query=request.query,
         limit=request.limit,
         offset=request.offset,
-        client_query_id=request.query_id
+        client_query_id=request.query_id,
+        count=request.count,
+        output="arrow" if wants_arrow(accept) else "json",
+        cache=request.cache,
+        cache_ttl=request.cache_ttl,
+        session=request.session,
+        request_class=request.request_class,
     )
+    if isinstance(result, Response):
+        return result
+    # Dict results skip jsonable_encoder and are written straight to bytes.
+    with metrics.stage("query", "json_encode"):
+        return FastJSONResponse(result)
+
+@router.post("/query/explain")
+async def explain_query(request: ExplainRequest):
+    return await query_service.explain_query_logic(
+        query=request.query,
+        limit=request.limit,
+        offset=request.offset,
+        count=request.count,
+        session=request.session,
+        request_class=request.request_class,
+    )
+
+@router.post("/query/jobs", status_code=202)
+async def submit_query_job(request: JobRequest):
+    job = await query_service.submit_query_job(
+        query=request.query,
+        client_job_id=request.job_id,
+        request_class=request.request_class,
+    )
+    return {**job, "status_url": f"/query/jobs/{job['job_id']}"}
+
+@router.get("/query/jobs/{job_id}")
+async def get_query_job(job_id: str):
+    return job_service.get_job(job_id).describe()
+
+@router.get("/query/jobs/{job_id}/result")
+async def get_query_job_result(
+    job_id: str,
+    limit: int = Query(10, ge=1),
+    offset: int = Query(0, ge=0),
+    accept: Optional[str] = Header(None),
+):
+    result = await query_service.get_job_result(
+        job_id, limit, offset, output="arrow" if wants_arrow(accept) else "json"
+    )
+    if isinstance(result, Response):
+        return result
+    with metrics.stage("query", "json_encode"):
+        return FastJSONResponse(result)
+
+@router.post("/query/jobs/{job_id}/cancel")
+async def cancel_query_job(job_id: str):
+    return await job_service.cancel_job(job_id)
+
+@router.delete("/query/jobs/{job_id}", status_code=204)
+async def delete_query_job(job_id: str):
+    job_service.delete_job(job_id)
+    return Response(status_code=204)
+
+@router.post("/query/export")
+async def export_query(request: ExportQueryRequest):
+    stream = await export_service.export_query(
+        query=request.query,
+        client_query_id=request.query_id,
+        fmt=request.format,
+    )
+    return StreamingResponse(stream, media_type=export_service.MEDIA_TYPES[request.format])
 
 @router.post("/query/cancel")
 async def cancel_query(request: CancelRequest):
-    pid = await cancel_service.cancel_query_by_id(request.query_id)
-    if not pid:
+    job_cancelled = job_service.request_cancel(request.query_id)
+    pids = await cancel_service.cancel_query_by_id(request.query_id)
+    session_closed = session_service.close_session(request.query_id)
+    if not pids and not session_closed and not job_cancelled:
          # raise HTTPException(status_code=404, detail="Query ID not found or query already completed")
          # The service returns None if not found. We should raise http exception here or in service.
          # For consistency with original main.py, let's raise it.
          from fastapi import HTTPException
          raise HTTPException(status_code=404, detail="Query ID not found or query already completed")
          
-    return {"cancelled": True, "pid": pid}
+    return {
+        "cancelled": True,
+        "pid": pids[0] if pids else None,
+        "pids": pids,
+        "session_closed": session_closed,
+        "job_cancelled": job_cancelled,
+    }
+
+@router.post("/query/cancel/bulk")
+async def cancel_queries(request: BulkCancelRequest):
+    cancelled = await cancel_service.cancel_queries_by_prefix(request.query_id_prefix)
+    return {"cancelled": len(cancelled), "queries": cancelled}
@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+from app.core.database import pool_status
+from app.services import (
+    admission_service, coalesce_service, job_service, metadata_service, query_service,
+    replica_service, session_service,
+)
+
+router = APIRouter()
+
+@router.get("/stats/pools")
+async def get_pool_stats():
+    return pool_status()
+
+@router.get("/stats/query-cache")
+async def get_query_cache_stats():
+    return query_service.result_cache_stats()
+
+@router.get("/stats/sessions")
+async def get_session_stats():
+    return session_service.session_stats()
+
+@router.get("/stats/admission")
+async def get_admission_stats():
+    return admission_service.admission_stats()
+
+@router.get("/stats/jobs")
+async def get_job_stats():
+    return job_service.job_stats()
+
+@router.get("/stats/statements")
+async def get_statement_stats():
+    return metadata_service.statement_cache_stats()
+
+@router.get("/stats/replicas")
+async def get_replica_stats():
+    return replica_service.replica_stats()
+
+@router.get("/stats/coalescing")
+async def get_coalescing_stats():
+    return coalesce_service.coalesce_stats()
@@ -1,10 +1,21 @@
 from typing import Literal, Optional
-from fastapi import APIRouter, Query
-from app.services import metadata_service
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from app.services import export_service, facet_service, metadata_service
+from app.core import metrics
+from app.utils.arrow import wants_arrow
+from app.utils.http_cache import not_modified
+from app.utils.serialization import FastJSONResponse
 from app.utils.sql_safety import _validate_ident
 
 # We need SortDir definition or just use str
 SortDir = Literal["asc", "desc"]
+PaginationMode = Literal["offset", "cursor"]
+CountMode = Literal["exact", "estimated", "none"]
+ExportFormat = Literal["ndjson", "csv"]
+# Pages may be stored but must be revalidated via ETag on every use.
+TABLE_CACHE_CONTROL = "private, no-cache"
+SampleMethod = Literal["system", "bernoulli"]
 
 router = APIRouter()
 
@@ -28,11 +39,20 @@ async def get_table(
     sort_dir: SortDir = Query("asc"),
     filters: Optional[str] = Query(None),
     auto_generate_schema: bool = Query(True),
+    pagination: PaginationMode = Query("offset"),
+    cursor: Optional[str] = Query(None),
+    count: CountMode = Query("exact"),
+    sample: Optional[SampleMethod] = Query(None),
+    seed: Optional[float] = Query(None),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     _validate_ident(schema, "schema")
     _validate_ident(table, "table")
-    
-    return await metadata_service.get_table_details(
+    if seed is not None and sample is None:
+        raise HTTPException(status_code=400, detail="seed requires sample")
+
+    result, etag = await metadata_service.get_table_details(
         schema=schema,
         table=table,
         limit=limit,
@@ -40,5 +60,73 @@ async def get_table(
         sort_by=sort_by,
         sort_dir=sort_dir,
         filters=filters,
-        auto_generate_schema=auto_generate_schema
+        auto_generate_schema=auto_generate_schema,
+        pagination=pagination,
+        cursor=cursor,
+        count=count,
+        output="arrow" if wants_arrow(accept) else "json",
+        sample=sample,
+        seed=seed,
+        if_none_match=if_none_match,
+    )
+    if result is None:
+        return not_modified(etag, TABLE_CACHE_CONTROL)
+    if not isinstance(result, Response):
+        # Dict results skip jsonable_encoder and are written straight to bytes.
+        with metrics.stage("table", "json_encode", metrics.table_label(schema, table)):
+            result = FastJSONResponse(result)
+    if etag:
+        result.headers["ETag"] = etag
+        result.headers["Cache-Control"] = TABLE_CACHE_CONTROL
+    return result
+
+@router.get("/table/facets")
+async def get_table_facets(
+    table: str = Query(...),
+    schema: str = Query("public"),
+    columns: Optional[str] = Query(None, description="Comma-separated; default all columns"),
+    filters: Optional[str] = Query(None),
+    top: int = Query(10, ge=1, le=100),
+    buckets: int = Query(10, ge=1, le=100),
+):
+    _validate_ident(schema, "schema")
+    _validate_ident(table, "table")
+
+    result = await facet_service.get_table_facets(
+        schema=schema,
+        table=table,
+        columns=columns,
+        filters=filters,
+        top=top,
+        buckets=buckets,
+    )
+    with metrics.stage("facets", "json_encode", metrics.table_label(schema, table)):
+        return FastJSONResponse(result)
+
+@router.get("/table/export")
+async def export_table(
+    table: str = Query(...),
+    schema: str = Query("public"),
+    sort_by: Optional[str] = Query(None),
+    sort_dir: SortDir = Query("asc"),
+    filters: Optional[str] = Query(None),
+    fmt: ExportFormat = Query("ndjson", alias="format"),
+    query_id: Optional[str] = Query(None),
+):
+    _validate_ident(schema, "schema")
+    _validate_ident(table, "table")
+
+    stream = await export_service.export_table(
+        schema=schema,
+        table=table,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        filters=filters,
+        fmt=fmt,
+        client_query_id=query_id,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=export_service.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{schema}.{table}.{fmt}"'},
     )
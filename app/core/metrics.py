@@ -0,0 +1,184 @@
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+from app.core import config
+
+# Label values are always drawn from fixed sets (route templates, stage and
+# pool names, allow-listed tables), never from SQL text or request input.
+REGISTRY = CollectorRegistry()
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "http_response_bytes",
+    "Response body bytes sent, by route template.",
+    ["route"],
+    registry=REGISTRY,
+)
+STAGE_SECONDS = Histogram(
+    "app_stage_duration_seconds",
+    "Time spent in each stage of serving a request.",
+    ["operation", "stage", "table"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+POOL_ACQUIRE_SECONDS = Histogram(
+    "db_pool_acquire_seconds",
+    "Time to check a connection out of a pool, including connects.",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+ROWS_RETURNED = Counter(
+    "app_rows_returned",
+    "Rows returned to clients.",
+    ["operation", "table"],
+    registry=REGISTRY,
+)
+QUERIES_CANCELLED = Counter(
+    "app_queries_cancelled",
+    "Query ids cancelled through /query/cancel.",
+    ["method"],
+    registry=REGISTRY,
+)
+PREFLIGHT_DECISIONS = Counter(
+    "app_preflight_decisions",
+    "Cost-based pre-flight outcomes for ad-hoc SQL.",
+    ["decision"],
+    registry=REGISTRY,
+)
+COMPRESSION_INPUT_BYTES = Counter(
+    "http_compression_input_bytes",
+    "Response body bytes before compression.",
+    ["route", "encoding"],
+    registry=REGISTRY,
+)
+COMPRESSION_OUTPUT_BYTES = Counter(
+    "http_compression_output_bytes",
+    "Response body bytes after compression.",
+    ["route", "encoding"],
+    registry=REGISTRY,
+)
+COMPRESSION_RATIO = Histogram(
+    "http_compression_ratio",
+    "Uncompressed / compressed size per compressed response.",
+    ["encoding"],
+    buckets=(1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 12.0, 20.0, 50.0),
+    registry=REGISTRY,
+)
+COMPRESSION_CPU_SECONDS = Histogram(
+    "http_compression_cpu_seconds",
+    "CPU time spent compressing each response.",
+    ["encoding"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def table_label(schema: str, table: str) -> str:
+    name = f"{schema}.{table}"
+    return name if name in config.METRICS_TABLE_ALLOWLIST else "other"
+
+
+@lru_cache(maxsize=None)
+def _stage_child(operation: str, stage: str, table: str):
+    return STAGE_SECONDS.labels(operation, stage, table)
+
+
+@contextmanager
+def stage(operation: str, name: str, table: str = ""):
+    if not config.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_child(operation, name, table).observe(time.perf_counter() - start)
+
+
+async def timed(awaitable, operation: str, name: str, table: str = ""):
+    with stage(operation, name, table):
+        return await awaitable
+
+
+def observe_pool_acquire(pool: str, seconds: float) -> None:
+    if config.METRICS_ENABLED:
+        POOL_ACQUIRE_SECONDS.labels(pool).observe(seconds)
+
+
+def count_rows(operation: str, rows: int, table: str = "") -> None:
+    if config.METRICS_ENABLED:
+        ROWS_RETURNED.labels(operation, table).inc(rows)
+
+
+def count_cancelled(method: str, queries: int) -> None:
+    if config.METRICS_ENABLED and queries:
+        QUERIES_CANCELLED.labels(method).inc(queries)
+
+
+def count_preflight(decision: str) -> None:
+    if config.METRICS_ENABLED:
+        PREFLIGHT_DECISIONS.labels(decision).inc()
+
+
+def observe_compression(route: str, encoding: str, raw: int, compressed: int, cpu_seconds: float) -> None:
+    if not config.METRICS_ENABLED:
+        return
+    COMPRESSION_INPUT_BYTES.labels(route, encoding).inc(raw)
+    COMPRESSION_OUTPUT_BYTES.labels(route, encoding).inc(compressed)
+    if compressed:
+        COMPRESSION_RATIO.labels(encoding).observe(raw / compressed)
+    COMPRESSION_CPU_SECONDS.labels(encoding).observe(cpu_seconds)
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: no request/response wrapping, so streaming
+    # responses pass through untouched and are timed to their last chunk.
+    def __init__(self, app, exclude: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths collapse into one series instead of one per URL.
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            HTTP_REQUEST_SECONDS.labels(path, method, f"{status // 100}xx").observe(
+                time.perf_counter() - start
+            )
+            if sent:
+                HTTP_RESPONSE_BYTES.labels(path).inc(sent)
@@ -1,8 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import query, metadata, tables
+from app.api.routes import query, metadata, tables, stats, advisor, metrics
+from app.core import config
+from app.core.metrics import MetricsMiddleware
+from app.core.database import REPLICAS
+from app.services import catalog_service, job_service, replica_service, session_service
+from app.utils.compression import CompressionMiddleware
 
-app = FastAPI(title="Postgres Table API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    session_service.init_session_dir()
+    tasks = [
+        asyncio.create_task(session_service.reap_idle_sessions()),
+        asyncio.create_task(job_service.reap_jobs()),
+    ]
+    if REPLICAS:
+        tasks.append(asyncio.create_task(replica_service.monitor_replicas()))
+    if config.CATALOG_LISTEN_ENABLED:
+        tasks.append(asyncio.create_task(catalog_service.listen_for_invalidations()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    session_service.clear_session_dir()
+
+app = FastAPI(title="Postgres Table API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,7 +35,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if config.COMPRESSION_ENABLED:
+    # Inside MetricsMiddleware, so http_response_bytes counts bytes on the wire.
+    app.add_middleware(CompressionMiddleware)
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(query.router)
 app.include_router(metadata.router)
 app.include_router(tables.router)
+app.include_router(stats.router)
+app.include_router(advisor.router)
+app.include_router(metrics.router)
@@ -1,11 +1,37 @@
-from typing import Optional, Any
-from pydantic import BaseModel
+from typing import Literal, Optional, Any
+from pydantic import BaseModel, Field
 
 class QueryRequest(BaseModel):
     query: str
     limit: int = 10
     offset: int = 0
     query_id: Optional[str] = None
+    count: Literal["exact", "estimated", "none"] = "exact"
+    cache: Literal["use", "bypass", "refresh"] = "use"
+    cache_ttl: Optional[float] = Field(None, gt=0)
+    session: bool = False
+    request_class: Literal["interactive", "batch"] = "interactive"
+
+class JobRequest(BaseModel):
+    query: str
+    job_id: Optional[str] = None
+    request_class: Literal["interactive", "batch"] = "batch"
 
 class CancelRequest(BaseModel):
     query_id: str
+
+class BulkCancelRequest(BaseModel):
+    query_id_prefix: str = Field(..., min_length=1)
+
+class ExportQueryRequest(BaseModel):
+    query: str
+    query_id: Optional[str] = None
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+class ExplainRequest(BaseModel):
+    query: str
+    limit: int = 10
+    offset: int = 0
+    count: Literal["exact", "estimated", "none"] = "exact"
+    session: bool = False
+    request_class: Literal["interactive", "batch"] = "interactive"
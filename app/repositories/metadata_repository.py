@@ -1,16 +1,17 @@
+from typing import Optional
 from sqlalchemy import text
 from fastapi import HTTPException
-from app.core.database import engine
+from app.core.database import catalog_engine
 
 async def _get_table_columns_with_types(schema: str, table: str) -> list[dict[str, str]]:
     sql = text("""
-        SELECT column_name, data_type
+        SELECT column_name, data_type, udt_schema, udt_name, is_nullable
         FROM information_schema.columns
         WHERE table_schema = :schema
           AND table_name = :table
         ORDER BY ordinal_position
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema, "table": table})
         rows = res.fetchall()
 
@@ -29,7 +30,33 @@ async def _get_table_columns_with_types(schema: str, table: str) -> list[dict[st
             return "datetime"
         return "string"
 
-    return [{"key": r[0], "type": map_type(r[1])} for r in rows]
+    return [
+        {
+            "key": r[0],
+            "type": map_type(r[1]),
+            "db_type": f'"{r[2]}"."{r[3]}"',
+            "udt": r[3],
+            "nullable": r[4] == "YES",
+        }
+        for r in rows
+    ]
+
+
+async def _get_primary_key_columns(schema: str, table: str) -> list[str]:
+    sql = text("""
+        SELECT a.attname
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class c ON c.oid = i.indrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum = ANY(i.indkey)
+        WHERE n.nspname = :schema
+          AND c.relname = :table
+          AND i.indisprimary
+        ORDER BY array_position(i.indkey::int2[], a.attnum)
+    """)
+    async with catalog_engine.connect() as conn:
+        res = await conn.execute(sql, {"schema": schema, "table": table})
+        return [r[0] for r in res.fetchall()]
 
 
 async def _get_all_tables(schema: str) -> list[str]:
@@ -39,7 +66,7 @@ async def _get_all_tables(schema: str) -> list[str]:
         WHERE table_schema = :schema
         ORDER BY table_name
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         rows = res.fetchall()
     return [r[0] for r in rows]
@@ -52,7 +79,7 @@ async def _get_schemas_and_tables() -> dict[str, list[str]]:
         WHERE table_schema NOT IN ('information_schema', 'pg_catalog')
         ORDER BY table_schema, table_name
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql)
         rows = res.fetchall()
 
@@ -74,7 +101,7 @@ async def _get_pg_schemas() -> list[str]:
           AND nspname <> 'information_schema'
         ORDER BY nspname
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql)
         rows = res.fetchall()
     return [r[0] for r in rows]
@@ -86,7 +113,7 @@ async def _get_pg_tables(schema: str) -> list[str]:
         FROM pg_tables
         WHERE schemaname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -97,7 +124,7 @@ async def _get_pg_views(schema: str) -> list[str]:
         FROM pg_views
         WHERE schemaname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -108,7 +135,7 @@ async def _get_pg_matviews(schema: str) -> list[str]:
         FROM pg_matviews
         WHERE schemaname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -119,7 +146,7 @@ async def _get_pg_indexes(schema: str) -> list[dict[str, str]]:
         FROM pg_indexes
         WHERE schemaname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [{"name": r[0], "table": r[1]} for r in res.fetchall()]
 
@@ -132,7 +159,7 @@ async def _get_pg_sequences(schema: str) -> list[str]:
         WHERE c.relkind = 'S'
           AND n.nspname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -144,7 +171,7 @@ async def _get_pg_datatypes(schema: str) -> list[str]:
         JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace
         WHERE n.nspname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -156,7 +183,7 @@ async def _get_pg_functions(schema: str) -> list[str]:
         JOIN pg_namespace n ON n.oid = p.pronamespace
         WHERE n.nspname = :schema
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema})
         return [r[0] for r in res.fetchall()]
 
@@ -179,7 +206,7 @@ async def _get_pg_columns(schema: str, table_name: str) -> list[dict[str, str]]:
           AND NOT a.attisdropped
         ORDER BY a.attnum
     """)
-    async with engine.connect() as conn:
+    async with catalog_engine.connect() as conn:
         res = await conn.execute(sql, {"schema": schema, "table": table_name})
         rows = res.fetchall()
         
@@ -192,3 +219,172 @@ async def _get_pg_columns(schema: str, table_name: str) -> list[dict[str, str]]:
         }
         for r in rows
     ]
+
+
+async def _get_catalog_version(schema: Optional[str] = None, table: Optional[str] = None) -> tuple:
+    # A catalog row's xmin changes whenever the row is updated (any DDL on the
+    # object), and rows appear/disappear on CREATE/DROP. Count plus oid and
+    # xmin sums over the rows a response is built from is a cheap version
+    # for it: no sort, and no need to read the objects themselves.
+    if schema is None:
+        sql = text("""
+            SELECT count(*), sum(oid::bigint), sum(xmin::text::bigint)
+            FROM pg_catalog.pg_namespace
+        """)
+        params = {}
+    else:
+        attributes = """
+            UNION ALL
+            SELECT a.attnum::int::oid, a.xmin
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+            WHERE c.relnamespace = (SELECT oid FROM ns)
+              AND c.relname = :table
+              AND a.attnum > 0
+        """ if table is not None else ""
+        sql = text(f"""
+            WITH ns AS (
+                SELECT oid, xmin FROM pg_catalog.pg_namespace WHERE nspname = :schema
+            ),
+            objs AS (
+                SELECT oid, xmin FROM ns
+                UNION ALL
+                SELECT c.oid, c.xmin FROM pg_catalog.pg_class c
+                WHERE c.relnamespace = (SELECT oid FROM ns)
+                UNION ALL
+                SELECT t.oid, t.xmin FROM pg_catalog.pg_type t
+                WHERE t.typnamespace = (SELECT oid FROM ns)
+                UNION ALL
+                SELECT p.oid, p.xmin FROM pg_catalog.pg_proc p
+                WHERE p.pronamespace = (SELECT oid FROM ns)
+                {attributes}
+            )
+            SELECT count(*), sum(oid::bigint), sum(xmin::text::bigint) FROM objs
+        """)
+        params = {"schema": schema, **({"table": table} if table is not None else {})}
+    async with catalog_engine.connect() as conn:
+        res = await conn.execute(sql, params)
+        return tuple(res.first())
+
+
+async def _get_pg_schema_overview(schema: str) -> dict[str, list]:
+    # Every object category of the catalog tree in one round trip.
+    sql = text("""
+        WITH ns AS (
+            SELECT oid FROM pg_catalog.pg_namespace WHERE nspname = :schema
+        )
+        SELECT CASE c.relkind
+                   WHEN 'r' THEN 'tables' WHEN 'p' THEN 'tables'
+                   WHEN 'v' THEN 'views'
+                   WHEN 'm' THEN 'matviews'
+                   WHEN 'S' THEN 'sequences'
+               END AS category,
+               c.relname AS name,
+               NULL AS parent
+        FROM pg_catalog.pg_class c
+        WHERE c.relnamespace = (SELECT oid FROM ns)
+          AND c.relkind IN ('r', 'p', 'v', 'm', 'S')
+        UNION ALL
+        SELECT 'indexes', ic.relname, tc.relname
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_catalog.pg_class tc ON tc.oid = i.indrelid
+        WHERE tc.relnamespace = (SELECT oid FROM ns)
+          AND tc.relkind IN ('r', 'm', 'p')
+          AND ic.relkind IN ('i', 'I')
+        UNION ALL
+        SELECT 'datatypes', t.typname, NULL
+        FROM pg_catalog.pg_type t
+        WHERE t.typnamespace = (SELECT oid FROM ns)
+        UNION ALL
+        SELECT 'functions', p.proname, NULL
+        FROM pg_catalog.pg_proc p
+        WHERE p.pronamespace = (SELECT oid FROM ns)
+        ORDER BY 1, 2, 3
+    """)
+    async with catalog_engine.connect() as conn:
+        res = await conn.execute(sql, {"schema": schema})
+        rows = res.fetchall()
+
+    overview = {
+        "tables": [],
+        "views": [],
+        "matviews": [],
+        "indexes": [],
+        "sequences": [],
+        "datatypes": [],
+        "functions": [],
+    }
+    for category, name, parent in rows:
+        if category == "indexes":
+            overview["indexes"].append({"name": name, "table": parent})
+        else:
+            overview[category].append(name)
+    return overview
+
+
+async def _get_table_index_profile(schema: str, table: str) -> dict:
+    # Leading key columns, access method and opclasses per index, plus the
+    # table's scan counters and whether pg_trgm is installed / installable.
+    index_sql = text("""
+        SELECT ic.relname,
+               am.amname,
+               ARRAY(
+                   SELECT pg_catalog.pg_get_indexdef(i.indexrelid, k, true)
+                   FROM generate_series(1, i.indnkeyatts) AS k
+                   ORDER BY k
+               ) AS columns,
+               ARRAY(
+                   SELECT opc.opcname
+                   FROM unnest(i.indclass::oid[]) WITH ORDINALITY AS u(opc_oid, ord)
+                   JOIN pg_catalog.pg_opclass opc ON opc.oid = u.opc_oid
+                   ORDER BY u.ord
+               ) AS opclasses,
+               i.indpred IS NOT NULL AS partial,
+               pg_catalog.pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_catalog.pg_am am ON am.oid = ic.relam
+        JOIN pg_catalog.pg_class tc ON tc.oid = i.indrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = tc.relnamespace
+        WHERE n.nspname = :schema
+          AND tc.relname = :table
+          AND i.indisvalid
+        ORDER BY ic.relname
+    """)
+    table_sql = text("""
+        SELECT s.seq_scan, s.idx_scan, c.reltuples::bigint,
+               EXISTS (SELECT 1 FROM pg_catalog.pg_extension WHERE extname = 'pg_trgm'),
+               EXISTS (SELECT 1 FROM pg_catalog.pg_available_extensions WHERE name = 'pg_trgm')
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_stat_user_tables s ON s.relid = c.oid
+        WHERE n.nspname = :schema
+          AND c.relname = :table
+    """)
+    params = {"schema": schema, "table": table}
+    async with catalog_engine.connect() as conn:
+        index_rows = (await conn.execute(index_sql, params)).fetchall()
+        table_row = (await conn.execute(table_sql, params)).first()
+
+    if table_row is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    return {
+        "indexes": [
+            {
+                "name": r[0],
+                "method": r[1],
+                "columns": [c.strip('"') for c in r[2]],
+                "opclasses": list(r[3]),
+                "partial": r[4],
+                "definition": r[5],
+            }
+            for r in index_rows
+        ],
+        "seq_scan": table_row[0],
+        "idx_scan": table_row[1],
+        "row_estimate": table_row[2] if table_row[2] >= 0 else None,
+        "pg_trgm_installed": table_row[3],
+        "pg_trgm_available": table_row[4],
+    }
@@ -1,20 +1,194 @@
+import json
 from sqlalchemy import text
-from app.core.database import engine
+import asyncio
+import logging
+from app.core.database import catalog_engine, control_engines, read_engine
 
-async def execute_count_query(sql, params):
-    async with engine.connect() as conn:
+logger = logging.getLogger(__name__)
+
+async def execute_count_query(sql, params, conn=None):
+    if conn is not None:
+        total_rows_res = await conn.execute(sql, params)
+        return total_rows_res.scalar_one()
+    async with read_engine("grid").connect() as conn:
         total_rows_res = await conn.execute(sql, params)
         return total_rows_res.scalar_one()
 
-async def execute_data_query(sql, params):
-    async with engine.connect() as conn:
+async def execute_data_query(sql, params, conn=None):
+    if conn is not None:
         return await conn.execute(sql, params)
+    async with read_engine("grid").connect() as conn:
+        return await conn.execute(sql, params)
+
+async def get_table_version(schema: str, table: str, conn=None) -> tuple | None:
+    # Changes whenever the table's rows or definition may have changed: the
+    # pg_class row (DDL, ANALYZE), relfilenode (TRUNCATE, rewrites) and the
+    # cumulative insert/update/delete counters. A standby keeps no counters
+    # for replayed changes, so there the replay position stands in for them.
+    # None when no reliable version exists (views, partitioned parents,
+    # track_counts off).
+    sql = text("""
+        SELECT c.relkind IN ('r', 'm') AND (pg_is_in_recovery() OR current_setting('track_counts')::bool),
+               c.xmin::text, c.relfilenode, c.reltuples,
+               s.n_tup_ins, s.n_tup_upd, s.n_tup_del, s.analyze_count + s.autoanalyze_count,
+               CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()::text END
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_stat_user_tables s ON s.relid = c.oid
+        WHERE n.nspname = :schema
+          AND c.relname = :table
+    """)
+    if conn is not None:
+        row = (await conn.execute(sql, {"schema": schema, "table": table})).first()
+    else:
+        async with read_engine("grid").connect() as conn:
+            row = (await conn.execute(sql, {"schema": schema, "table": table})).first()
+    if row is None or not row[0]:
+        return None
+    return tuple(row[1:])
 
 async def get_backend_pid(conn):
     pid_res = await conn.execute(text("SELECT pg_backend_pid()"))
     return pid_res.scalar_one()
     
+async def tag_backend(conn, tag: str, local_settings: dict[str, str] | None = None) -> int:
+    # set_config() runs inside the connection's transaction, so the rollback on
+    # return to the pool restores the previous application_name. local_settings
+    # are applied like SET LOCAL and end with the transaction.
+    params = {"tag": tag}
+    columns = ["pg_backend_pid()", "set_config('application_name', :tag, false)"]
+    for i, (name, value) in enumerate((local_settings or {}).items()):
+        columns.append(f"set_config(:n{i}, :v{i}, true)")
+        params[f"n{i}"] = name
+        params[f"v{i}"] = value
+    res = await conn.execute(text(f"SELECT {', '.join(columns)}"), params)
+    return res.first()[0]
+
+async def cancel_backends_by_app_name(tag: str, prefix: bool = False) -> list[tuple[int, str]]:
+    if prefix:
+        tag = tag.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        match_sql = "application_name LIKE :tag"
+    else:
+        match_sql = "application_name = :tag"
+    # MATERIALIZED keeps the planner from evaluating pg_cancel_backend()
+    # before the application_name filter.
+    sql = text(f"""
+        WITH targets AS MATERIALIZED (
+            SELECT pid, application_name
+            FROM pg_catalog.pg_stat_activity
+            WHERE {match_sql}
+              AND pid <> pg_backend_pid()
+        )
+        SELECT pid, application_name
+        FROM targets
+        WHERE pg_cancel_backend(pid)
+    """)
+
+    async def cancel_on(eng):
+        async with eng.connect() as conn:
+            res = await conn.execute(sql, {"tag": tag})
+            return [(r[0], r[1]) for r in res.fetchall()]
+
+    # The query may be running on the primary or any replica.
+    engines = control_engines()
+    results = await asyncio.gather(*(cancel_on(e) for e in engines), return_exceptions=True)
+    cancelled = []
+    for eng, res in zip(engines, results):
+        if isinstance(res, BaseException):
+            if len(engines) == 1:
+                raise res
+            logger.warning("Cancel on %s failed: %s", eng.pool.logging_name, res)
+            continue
+        cancelled.extend(res)
+    return cancelled
+
+async def cancel_backend_pids(pids: list[int]):
+    sql = text("SELECT pg_cancel_backend(pid) FROM unnest(CAST(:pids AS int[])) AS pid")
+    async with catalog_engine.connect() as conn:
+        await conn.execute(sql, {"pids": pids})
+
 async def cancel_backend_pid(pid: int):
      sql = text("SELECT pg_cancel_backend(:pid)")
-     async with engine.connect() as conn:
+     async with catalog_engine.connect() as conn:
         await conn.execute(sql, {"pid": pid})
+
+async def execute_estimate_query(sql, params, conn=None):
+    if conn is not None:
+        plan = (await conn.execute(sql, params)).scalar_one()
+    else:
+        async with read_engine("grid").connect() as conn:
+            plan = (await conn.execute(sql, params)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def get_table_row_estimate(schema: str, table: str):
+    sql = text("""
+        SELECT c.reltuples
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema
+          AND c.relname = :table
+    """)
+    async with read_engine("grid").connect() as conn:
+        res = await conn.execute(sql, {"schema": schema, "table": table})
+        reltuples = res.scalar_one_or_none()
+    # reltuples is -1 for tables that were never vacuumed/analyzed
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
+async def get_table_size_estimate(schema: str, table: str) -> tuple[int | None, int]:
+    # (reltuples, relpages) planner statistics; reltuples is None before the
+    # first VACUUM/ANALYZE.
+    sql = text("""
+        SELECT c.reltuples, c.relpages
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema
+          AND c.relname = :table
+    """)
+    async with read_engine("grid").connect() as conn:
+        res = await conn.execute(sql, {"schema": schema, "table": table})
+        row = res.first()
+    if row is None or row[0] < 0:
+        return None, row[1] if row else 0
+    return int(row[0]), row[1]
+
+async def explain_query(sql: str, statement_timeout: str):
+    # Plans only (no ANALYZE); the timeout guards against pathological planning.
+    async with read_engine("adhoc").connect() as conn:
+        await conn.execute(
+            text("SELECT set_config('statement_timeout', :t, true)"), {"t": statement_timeout}
+        )
+        plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan
+
+async def execute_facet_query(sql, params, statement_timeout: str):
+    # Facets aggregate the whole (filtered) table, so they get their own timeout.
+    async with read_engine("grid").connect() as conn:
+        await conn.execute(
+            text("SELECT set_config('statement_timeout', :t, true)"), {"t": statement_timeout}
+        )
+        return (await conn.execute(sql, params)).mappings().all()
+
+async def get_primary_wal_lsn(eng) -> str:
+    async with eng.connect() as conn:
+        return (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar_one()
+
+async def get_replication_status(eng, primary_lsn: str | None) -> tuple[bool, bool, float | None]:
+    # (in recovery, replayed up to primary_lsn, seconds since the last replayed
+    # commit). Received == replayed says nothing about freshness: a standby
+    # whose WAL receiver is disconnected stops receiving and looks caught up.
+    sql = text("""
+        SELECT pg_is_in_recovery(),
+               COALESCE(pg_last_wal_replay_lsn() >= CAST(CAST(:primary_lsn AS text) AS pg_lsn), false),
+               EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    """)
+    async with eng.connect() as conn:
+        in_recovery, caught_up, replay_age = (
+            await conn.execute(sql, {"primary_lsn": primary_lsn})
+        ).first()
+    return in_recovery, caught_up, None if replay_age is None else float(replay_age)
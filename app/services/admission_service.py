@@ -0,0 +1,111 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from fastapi import HTTPException
+
+from app.core import config
+
+
+class AdmissionController:
+    # Concurrency limit with a bounded FIFO wait queue for one request class.
+    def __init__(self, name: str, settings: config.RequestClassSettings):
+        self.name = name
+        self.settings = settings
+        self._slots = asyncio.Semaphore(settings.max_concurrency)
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Smoothed time a query holds its slot; drives Retry-After.
+        self.service_time = 1.0
+
+    @property
+    def session_settings(self) -> dict[str, str]:
+        # Applied with SET LOCAL on every connection doing work for the query.
+        return {
+            "statement_timeout": self.settings.statement_timeout,
+            "work_mem": self.settings.work_mem,
+        }
+
+    def _retry_after(self) -> str:
+        backlog = (self.queued + 1) / max(self.settings.max_concurrency, 1)
+        return str(max(1, math.ceil(backlog * self.service_time)))
+
+    def _reject(self, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=429, detail=detail, headers={"Retry-After": self._retry_after()}
+        )
+
+    def check_capacity(self) -> None:
+        capacity = self.settings.max_concurrency + self.settings.max_queue
+        if self.running + self.queued >= capacity:
+            self.rejected += 1
+            raise self._reject(f"Too many queued {self.name} queries")
+
+    async def acquire(self) -> None:
+        self.check_capacity()
+
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.settings.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise self._reject(f"Timed out waiting for a {self.name} query slot")
+        finally:
+            self.queued -= 1
+            waited = time.perf_counter() - start
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+        self.running += 1
+        self.admitted += 1
+
+    def release(self, held_for: float) -> None:
+        self.running -= 1
+        self.service_time = 0.8 * self.service_time + 0.2 * held_for
+        self._slots.release()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[dict[str, str]]:
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield self.session_settings
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, Any]:
+        waits = self.admitted + self.timed_out
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "max_concurrency": self.settings.max_concurrency,
+            "max_queue": self.settings.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_avg_ms": round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "statement_timeout": self.settings.statement_timeout,
+            "work_mem": self.settings.work_mem,
+        }
+
+
+CONTROLLERS: dict[str, AdmissionController] = {
+    name: AdmissionController(name, config.request_class_settings(name))
+    for name in config.REQUEST_CLASSES
+}
+
+
+def controller_for(request_class: str) -> AdmissionController:
+    return CONTROLLERS[request_class]
+
+
+def admission_stats() -> dict[str, Any]:
+    return {name: c.stats() for name, c in CONTROLLERS.items()}
@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+from app.core import config
+from app.repositories import metadata_repository
+from app.services import catalog_service
+
+# /table filter ops grouped by what the generated SQL needs from an index.
+# Every string op is an ILIKE, which a plain btree cannot serve (not even a
+# prefix match, since it is case-insensitive); only a trigram index can.
+OP_PATTERNS = {
+    "eq": "eq",
+    "gt": "range",
+    "gte": "range",
+    "lt": "range",
+    "lte": "range",
+    "starts_with": "prefix",
+    "contains": "substring",
+    "ends_with": "substring",
+}
+PATTERN_ACCESS = {
+    "eq": "btree",
+    "range": "btree",
+    "sort": "btree",
+    "prefix": "trgm",
+    "substring": "trgm",
+}
+TRGM_OPCLASSES = {"gin_trgm_ops", "gist_trgm_ops"}
+
+
+@dataclass
+class UsageStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+        }
+
+
+@dataclass
+class TableUsage:
+    requests: UsageStats = field(default_factory=UsageStats)
+    # (column, pattern) -> stats, e.g. ("customer", "substring")
+    patterns: dict[tuple[str, str], UsageStats] = field(default_factory=dict)
+    # (column, access) -> stats, counted once per request
+    access: dict[tuple[str, str], UsageStats] = field(default_factory=dict)
+
+
+# (schema, table) -> usage; least recently used tables are dropped first.
+TABLE_USAGE: "OrderedDict[tuple[str, str], TableUsage]" = OrderedDict()
+
+
+def record_table_access(
+    schema: str,
+    table: str,
+    filters: list[tuple[str, str]],
+    sort_by: Optional[str],
+    duration: float,
+) -> None:
+    if not config.ADVISOR_ENABLED:
+        return
+
+    key = (schema, table)
+    usage = TABLE_USAGE.get(key)
+    if usage is None:
+        usage = TABLE_USAGE[key] = TableUsage()
+        while len(TABLE_USAGE) > config.ADVISOR_MAX_TABLES:
+            TABLE_USAGE.popitem(last=False)
+    else:
+        TABLE_USAGE.move_to_end(key)
+
+    ms = duration * 1000
+    usage.requests.add(ms)
+
+    patterns = {(f, OP_PATTERNS[op]) for f, op in filters if op in OP_PATTERNS}
+    if sort_by:
+        patterns.add((sort_by, "sort"))
+    for p in patterns:
+        usage.patterns.setdefault(p, UsageStats()).add(ms)
+    for a in {(col, PATTERN_ACCESS[pattern]) for col, pattern in patterns}:
+        usage.access.setdefault(a, UsageStats()).add(ms)
+
+
+def reset(schema: Optional[str] = None, table: Optional[str] = None) -> int:
+    keys = [
+        k for k in TABLE_USAGE
+        if (schema is None or k[0] == schema) and (table is None or k[1] == table)
+    ]
+    for k in keys:
+        del TABLE_USAGE[k]
+    return len(keys)
+
+
+def _covering_index(
+    indexes: list[dict[str, Any]], column: str, access: str, patterns: set[str]
+) -> Optional[str]:
+    for idx in indexes:
+        if idx["partial"] or not idx["columns"]:
+            continue
+        if access == "btree":
+            if idx["method"] == "btree" and idx["columns"][0] == column:
+                return idx["name"]
+            if idx["method"] == "hash" and idx["columns"][0] == column and patterns <= {"eq"}:
+                return idx["name"]
+        elif idx["method"] in {"gin", "gist"}:
+            for col, opclass in zip(idx["columns"], idx["opclasses"]):
+                if col == column and opclass in TRGM_OPCLASSES:
+                    return idx["name"]
+    return None
+
+
+def _index_ddl(schema: str, table: str, column: str, access: str) -> str:
+    if access == "trgm":
+        return (
+            f'CREATE INDEX CONCURRENTLY ON "{schema}"."{table}" '
+            f'USING gin ("{column}" gin_trgm_ops)'
+        )
+    return f'CREATE INDEX CONCURRENTLY ON "{schema}"."{table}" ("{column}")'
+
+
+async def _table_report(schema: str, table: str, usage: TableUsage) -> dict[str, Any]:
+    profile = await metadata_repository._get_table_index_profile(schema, table)
+    col_types = {c["key"]: c["type"] for c in await catalog_service.get_table_columns(schema, table)}
+    indexes = profile["indexes"]
+
+    patterns = []
+    for (column, pattern), stats in usage.patterns.items():
+        access = PATTERN_ACCESS[pattern]
+        seen = {p for c, p in usage.patterns if c == column and PATTERN_ACCESS[p] == access}
+        patterns.append({
+            "column": column,
+            "pattern": pattern,
+            **stats.as_dict(),
+            "covered_by": _covering_index(indexes, column, access, seen),
+        })
+    patterns.sort(key=lambda p: (-p["total_ms"], -p["count"]))
+
+    candidates = []
+    for (column, access), stats in usage.access.items():
+        seen = {p for c, p in usage.patterns if c == column and PATTERN_ACCESS[p] == access}
+        if _covering_index(indexes, column, access, seen):
+            continue
+        # A btree on a two-valued column rarely beats a seq scan.
+        if col_types.get(column) == "boolean":
+            continue
+
+        candidate = {
+            "table": f"{schema}.{table}",
+            "column": column,
+            "access": access,
+            "patterns": sorted(seen),
+            **stats.as_dict(),
+            "ddl": [_index_ddl(schema, table, column, access)],
+        }
+        if access == "trgm" and not profile["pg_trgm_installed"]:
+            # Still listed when the server lacks pg_trgm: it says what the
+            # ILIKE filters are costing even if the fix needs a package install.
+            candidate["ddl"].insert(0, "CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            candidate["requires_extension"] = "pg_trgm"
+            candidate["extension_available"] = profile["pg_trgm_available"]
+        candidates.append(candidate)
+
+    return {
+        "table": f"{schema}.{table}",
+        "requests": usage.requests.as_dict(),
+        "seq_scan": profile["seq_scan"],
+        "idx_scan": profile["idx_scan"],
+        "row_estimate": profile["row_estimate"],
+        "pg_trgm": {
+            "installed": profile["pg_trgm_installed"],
+            "available": profile["pg_trgm_available"],
+        },
+        "indexes": [
+            {"name": i["name"], "method": i["method"], "definition": i["definition"]}
+            for i in indexes
+        ],
+        "patterns": patterns,
+        "candidates": candidates,
+    }
+
+
+async def index_advice(
+    schema: Optional[str] = None, table: Optional[str] = None, limit: int = 20
+) -> dict[str, Any]:
+    tables = []
+    candidates = []
+    for (s, t), usage in list(TABLE_USAGE.items()):
+        if (schema is not None and s != schema) or (table is not None and t != table):
+            continue
+        try:
+            report = await _table_report(s, t, usage)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            # Dropped since it was recorded.
+            TABLE_USAGE.pop((s, t), None)
+            continue
+        candidates.extend(report.pop("candidates"))
+        tables.append(report)
+
+    # Rank by time spent in requests the index would serve, then frequency.
+    candidates.sort(key=lambda c: (-c["total_ms"], -c["count"]))
+    tables.sort(key=lambda t: -t["requests"]["total_ms"])
+    return {
+        "enabled": config.ADVISOR_ENABLED,
+        "tracked_tables": len(TABLE_USAGE),
+        "candidates": candidates[:limit],
+        "tables": tables,
+    }
@@ -1,20 +1,67 @@
+import hashlib
+from fastapi import HTTPException
+from app.core import metrics
 from app.repositories import query_repository
 
-QUERY_PIDS: dict[str, int] = {}
+# Every backend running work for a query_id carries application_name
+# 'q:<query_id>', so any worker (or host) can find it in pg_stat_activity.
+APP_NAME_PREFIX = "q:"
+# application_name is truncated to NAMEDATALEN - 1 bytes by the server
+MAX_APP_NAME_BYTES = 63
+# Longer ids are stored as '<head>#<digest>'. The head is the id's leading
+# bytes, so a bulk-cancel prefix up to MAX_PREFIX_BYTES long still matches them.
+DIGEST_CHARS = 16
+MAX_PREFIX_BYTES = MAX_APP_NAME_BYTES - len(APP_NAME_PREFIX) - 1 - DIGEST_CHARS
+
+# query_id -> backend PIDs working on it in this process (data query plus any
+# concurrent count); used for in-flight bookkeeping, not for cancellation.
+QUERY_PIDS: dict[str, list[int]] = {}
+
+def backend_tag(query_id: str) -> str:
+    tag = APP_NAME_PREFIX + query_id
+    if len(tag.encode("utf-8")) <= MAX_APP_NAME_BYTES:
+        return tag
+    # Too long to survive truncation: keep the head, then a stable digest.
+    head = query_id.encode("utf-8")[:MAX_PREFIX_BYTES].decode("utf-8", errors="ignore")
+    digest = hashlib.sha1(query_id.encode("utf-8")).hexdigest()[:DIGEST_CHARS]
+    return APP_NAME_PREFIX + head + "#" + digest
+
+async def track_connection(conn, query_id: str, local_settings: dict[str, str] | None = None) -> int:
+    pid = await query_repository.tag_backend(conn, backend_tag(query_id), local_settings)
+    register_pid(query_id, pid)
+    return pid
 
 def register_pid(query_id: str, pid: int):
-    QUERY_PIDS[query_id] = pid
+    QUERY_PIDS.setdefault(query_id, []).append(pid)
 
 def unregister_pid(query_id: str):
     QUERY_PIDS.pop(query_id, None)
 
+def get_pids(query_id: str) -> list[int]:
+    return list(QUERY_PIDS.get(query_id, ()))
+
 def get_pid(query_id: str) -> int | None:
-    return QUERY_PIDS.get(query_id)
-
-async def cancel_query_by_id(query_id: str) -> int:
-    pid = get_pid(query_id)
-    if not pid:
-        return None
-    
-    await query_repository.cancel_backend_pid(pid)
-    return pid
+    pids = QUERY_PIDS.get(query_id)
+    return pids[0] if pids else None
+
+async def cancel_query_by_id(query_id: str) -> list[int]:
+    cancelled = await query_repository.cancel_backends_by_app_name(backend_tag(query_id))
+    metrics.count_cancelled("single", 1 if cancelled else 0)
+    return [pid for pid, _ in cancelled]
+
+async def cancel_queries_by_prefix(prefix: str) -> dict[str, list[int]]:
+    # Bulk cancel, e.g. every query_id a client namespaced as "<user>:...".
+    if len(prefix.encode("utf-8")) > MAX_PREFIX_BYTES:
+        # Only the head of a long id is stored, so a longer prefix would skip them.
+        raise HTTPException(
+            status_code=400,
+            detail=f"query_id_prefix must be at most {MAX_PREFIX_BYTES} bytes",
+        )
+    cancelled = await query_repository.cancel_backends_by_app_name(
+        APP_NAME_PREFIX + prefix, prefix=True
+    )
+    by_query: dict[str, list[int]] = {}
+    for pid, app_name in cancelled:
+        by_query.setdefault(app_name[len(APP_NAME_PREFIX):], []).append(pid)
+    metrics.count_cancelled("bulk", len(by_query))
+    return by_query
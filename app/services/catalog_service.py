@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Optional
+
+from app.core import config
+from app.core.database import catalog_engine
+from app.repositories import metadata_repository
+from app.services import coalesce_service
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (kind, schema, table) -> catalog rows; read-only for callers.
+_catalog_cache = TTLCache(maxsize=config.CATALOG_CACHE_SIZE, ttl=config.CATALOG_CACHE_TTL)
+
+# Invalidation counters for everything, a schema, and a table. A load started
+# before an invalidation of its table must not be cached after it.
+_generations: dict[tuple[str, ...], int] = {}
+
+
+def _generation(schema: str, table: str) -> tuple[int, int, int]:
+    return (
+        _generations.get((), 0),
+        _generations.get((schema,), 0),
+        _generations.get((schema, table), 0),
+    )
+
+
+async def _load(key: tuple[str, str, str], load) -> Any:
+    _, schema, table = key
+    generation = _generation(schema, table)
+    # A cold table hit by many requests at once is read from the catalog once.
+    # The generation is part of the key, so requests after an invalidation do
+    # not join a load that started before it.
+    value = await coalesce_service.run("catalog", (*key, generation), load)
+    if _generation(schema, table) == generation:
+        _catalog_cache.set(key, value)
+    return value
+
+
+async def get_table_columns(schema: str, table: str) -> list[dict[str, Any]]:
+    key = ("columns", schema, table)
+    cols = _catalog_cache.get(key)
+    if cols is None:
+        cols = await _load(key, lambda: metadata_repository._get_table_columns_with_types(schema, table))
+    return cols
+
+
+async def get_primary_key_columns(schema: str, table: str) -> list[str]:
+    key = ("pk", schema, table)
+    pk_cols = _catalog_cache.get(key)
+    if pk_cols is None:
+        pk_cols = await _load(key, lambda: metadata_repository._get_primary_key_columns(schema, table))
+    return pk_cols
+
+
+def invalidate(schema: Optional[str] = None, table: Optional[str] = None) -> int:
+    scope = tuple(p for p in (schema, table) if p is not None)
+    _generations[scope] = _generations.get(scope, 0) + 1
+    if schema is None:
+        return _catalog_cache.clear()
+    return _catalog_cache.pop_where(
+        lambda k: k[1] == schema and (table is None or k[2] == table)
+    )
+
+
+def cache_stats() -> dict[str, Any]:
+    return _catalog_cache.stats()
+
+
+def _on_catalog_notify(connection, pid, channel, payload: str) -> None:
+    # Payload is the DDL object identity, e.g. "public.orders" or
+    # "public.orders.amount" for a dropped column.
+    parts = [p.strip('"') for p in payload.split(".")]
+    if len(parts) < 2:
+        invalidate()
+    else:
+        invalidate(parts[0], parts[1])
+
+
+async def listen_for_invalidations() -> None:
+    # Holds one connection for LISTEN; reconnects if it drops.
+    while True:
+        try:
+            async with catalog_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                driver_conn = raw.driver_connection
+                await driver_conn.add_listener(config.CATALOG_LISTEN_CHANNEL, _on_catalog_notify)
+                # Anything may have changed while we were not listening.
+                invalidate()
+                try:
+                    while not driver_conn.is_closed():
+                        await asyncio.sleep(5)
+                finally:
+                    if not driver_conn.is_closed():
+                        await driver_conn.remove_listener(
+                            config.CATALOG_LISTEN_CHANNEL, _on_catalog_notify
+                        )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Catalog LISTEN connection failed; retrying")
+        await asyncio.sleep(5)
@@ -0,0 +1,97 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from app.core import config
+from app.core.database import STATEMENT_COUNTER
+
+T = TypeVar("T")
+
+
+@dataclass
+class Flight:
+    task: asyncio.Task
+    # Callers still awaiting the result; the work is cancelled when it drops to 0.
+    waiters: int = 1
+    followers: int = 0
+    statements: list[int] = field(default_factory=lambda: [0])
+
+
+@dataclass
+class CoalesceStats:
+    leaders: int = 0
+    followers: int = 0
+    statements_saved: int = 0
+
+
+# (route, ...canonical request key) -> the execution in flight for it.
+FLIGHTS: dict[Hashable, Flight] = {}
+COALESCE_STATS: dict[str, CoalesceStats] = {}
+
+
+async def _lead(work: Callable[[], Awaitable[T]], statements: list[int]) -> T:
+    # Runs in its own task, so the counter only sees this execution's statements.
+    # A flight nested in another (a catalog load inside a /table page) also adds
+    # its statements to the outer one: the outer followers saved those too.
+    parent = STATEMENT_COUNTER.get()
+    STATEMENT_COUNTER.set(statements)
+    try:
+        return await work()
+    finally:
+        if parent is not None:
+            parent[0] += statements[0]
+
+
+def _land(route: str, key: Hashable, flight: Flight) -> None:
+    if FLIGHTS.get(key) is flight:
+        del FLIGHTS[key]
+    if flight.followers and not flight.task.cancelled():
+        saved = flight.statements[0] * flight.followers
+        COALESCE_STATS.setdefault(route, CoalesceStats()).statements_saved += saved
+
+
+async def run(route: str, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+    # Single-flight: the first caller for a key starts `work`; identical calls
+    # arriving before it finishes await the same result (or exception) instead
+    # of running their own. Results are shared, so callers must not mutate them.
+    if not config.COALESCE_ENABLED:
+        return await work()
+
+    key = (route, key)
+    stats = COALESCE_STATS.setdefault(route, CoalesceStats())
+    flight = FLIGHTS.get(key)
+    if flight is None:
+        statements = [0]
+        flight = Flight(task=asyncio.ensure_future(_lead(work, statements)), statements=statements)
+        FLIGHTS[key] = flight
+        flight.task.add_done_callback(lambda _, f=flight: _land(route, key, f))
+        stats.leaders += 1
+    else:
+        flight.waiters += 1
+        flight.followers += 1
+        stats.followers += 1
+
+    try:
+        # shield: one caller going away must not cancel the work for the rest.
+        return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if not flight.task.done():
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+        raise
+
+
+def coalesce_stats() -> dict[str, Any]:
+    return {
+        "enabled": config.COALESCE_ENABLED,
+        "in_flight": len(FLIGHTS),
+        "routes": {
+            route: {
+                "leaders": s.leaders,
+                "followers": s.followers,
+                "statements_saved": s.statements_saved,
+            }
+            for route, s in COALESCE_STATS.items()
+        },
+    }
@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Any, Optional
+from sqlalchemy import TextClause, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core import config
+from app.repositories import query_repository
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+# Wrapping the same source SQL always yields the same statement object, so
+# repeated counts skip re-parsing the text for bind parameters.
+@lru_cache(maxsize=config.TABLE_STATEMENT_CACHE_SIZE)
+def _count_statement(source_sql: str) -> TextClause:
+    return text(f"SELECT COUNT(*) FROM ({source_sql}) AS count_query")
+
+@lru_cache(maxsize=config.TABLE_STATEMENT_CACHE_SIZE)
+def _explain_statement(source_sql: str) -> TextClause:
+    return text(f"EXPLAIN (FORMAT JSON) {source_sql}")
+
+async def count_rows(
+    mode: str,
+    source_sql: str,
+    params: dict[str, Any],
+    relation: Optional[tuple[str, str]] = None,
+    conn: Optional[AsyncConnection] = None,
+) -> Optional[int]:
+    # `relation` is passed only for unfiltered table reads, where the planner
+    # statistics in pg_class.reltuples are a good enough estimate. `conn` pins
+    # the count to a caller-owned (e.g. PID-tracked) connection.
+    if mode == "none":
+        return None
+
+    if mode == "estimated":
+        if relation:
+            total = await query_repository.get_table_row_estimate(*relation)
+            if total is not None:
+                return total
+        return await query_repository.execute_estimate_query(
+            _explain_statement(source_sql), params, conn=conn
+        )
+
+    return await query_repository.execute_count_query(
+        _count_statement(source_sql), params, conn=conn
+    )
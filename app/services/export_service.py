@@ -0,0 +1,156 @@
+import csv
+import io
+import uuid
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core import config, metrics
+from app.core.database import read_engine
+from app.services import admission_service, cancel_service, metadata_service
+from app.utils.serialization import dumps_line, row_converter
+from app.utils.sql_safety import _is_query_safe
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _csv_cell(v: Any) -> Any:
+    if v is None:
+        return ""
+    return v
+
+
+def _encode_batch(fmt: str, rows: list[dict[str, Any]], keys: list[str]) -> bytes:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerows([_csv_cell(r[k]) for k in keys] for r in rows)
+        return buf.getvalue().encode("utf-8")
+    return b"".join(dumps_line(r) for r in rows)
+
+
+def _csv_header(keys: list[str]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(keys)
+    return buf.getvalue().encode("utf-8")
+
+
+async def _stream_rows(
+    sql,
+    params: dict[str, Any],
+    fmt: str,
+    category_of: Callable[[str], str],
+    query_id: Optional[str] = None,
+    controller=None,
+) -> AsyncIterator[bytes]:
+    # A server-side cursor hands rows over EXPORT_BATCH_SIZE at a time, so only
+    # one batch is ever held in memory regardless of the result size. The
+    # statement runs and its first batch is fetched before the response starts,
+    # so SQL errors and timeouts up to that point are still a 400.
+    stack = AsyncExitStack()
+    try:
+        limits = None
+        if controller is not None:
+            limits = await stack.enter_async_context(controller.admit())
+        conn = await stack.enter_async_context(read_engine("adhoc").connect())
+        if query_id:
+            await cancel_service.track_connection(conn, query_id, limits)
+            stack.callback(cancel_service.unregister_pid, query_id)
+        try:
+            result = await conn.stream(
+                sql.execution_options(yield_per=config.EXPORT_BATCH_SIZE), params
+            )
+            partitions = result.partitions()
+            first = await anext(partitions, None)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    keys = list(result.keys())
+    convert_row = row_converter(tuple(keys), tuple(category_of(k) for k in keys))
+    return _encode_stream(stack, partitions, first, keys, convert_row, fmt)
+
+
+async def _encode_stream(
+    stack: AsyncExitStack,
+    partitions: AsyncIterator[Any],
+    first: Optional[Any],
+    keys: list[str],
+    convert_row: Callable[[Any], dict[str, Any]],
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    async with stack:
+        if fmt == "csv":
+            yield _csv_header(keys)
+        partition = first
+        while partition is not None:
+            rows = [convert_row(r) for r in partition]
+            metrics.count_rows("export", len(rows))
+            yield _encode_batch(fmt, rows, keys)
+            partition = await anext(partitions, None)
+
+
+async def export_table(
+    schema: str,
+    table: str,
+    sort_by: Optional[str],
+    sort_dir: str,
+    filters: Optional[str],
+    fmt: str,
+    client_query_id: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    # Validation runs before the response starts so bad input is still a 400.
+    db_cols, _, _, col_map = await metadata_service._resolve_table_columns(schema, table, True)
+    metadata_service._validate_sort(sort_by, db_cols, col_map)
+    where_clauses, bind_params = metadata_service._build_filter_clauses(filters, db_cols, col_map)
+
+    where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    order_sql = f' ORDER BY "{sort_by}" {sort_dir.upper()}' if sort_by else ""
+    sql = text(f'SELECT * FROM "{schema}"."{table}"{where_sql}{order_sql}')
+
+    # Same `adhoc` pool and batch slot as a query export, so long table exports
+    # queue behind admission instead of holding every pool connection.
+    controller = admission_service.controller_for("batch")
+    controller.check_capacity()
+    return await _stream_rows(
+        sql,
+        bind_params,
+        fmt,
+        lambda k: col_map[k]["type"],
+        query_id=client_query_id or str(uuid.uuid4()),
+        controller=controller,
+    )
+
+
+async def export_query(query: str, client_query_id: Optional[str], fmt: str) -> AsyncIterator[bytes]:
+    original_sql = query.strip()
+    if not _is_query_safe(original_sql):
+        raise HTTPException(
+            status_code=400,
+            detail="Query contains restricted keywords (e.g. INSERT, UPDATE, DROP) or multiple statements."
+        )
+    inner_sql = original_sql.rstrip(";")
+    sql = text(f"""
+        SELECT * FROM (
+            {inner_sql}
+        ) AS export_query
+    """)
+
+    # A full queue is rejected up front; the slot is held until the stream ends.
+    controller = admission_service.controller_for("batch")
+    controller.check_capacity()
+    return await _stream_rows(
+        sql,
+        {},
+        fmt,
+        lambda k: "string",
+        query_id=client_query_id or str(uuid.uuid4()),
+        controller=controller,
+    )
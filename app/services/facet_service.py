@@ -0,0 +1,225 @@
+import math
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
+from fastapi import HTTPException
+from sqlalchemy import TextClause, text
+
+from app.core import config, metrics
+from app.repositories import query_repository
+from app.services import coalesce_service, metadata_service
+
+# Categories (from metadata_repository.map_type) that get min/max and a
+# histogram; string and boolean columns get their top-N values instead.
+RANGE_TYPES = {"number", "date", "datetime"}
+
+
+class FacetStatement(NamedTuple):
+    sql: TextClause
+    # GROUPING() bitmask of each column's grouping set, in column order.
+    masks: tuple[int, ...]
+
+
+def _epoch(expr: str, category: str) -> str:
+    # Histogram position as float8; dates/timestamps bucket on epoch seconds.
+    if category == "date":
+        return f"extract(epoch FROM {expr}::timestamp)::float8"
+    if category == "datetime":
+        return f"extract(epoch FROM {expr})::float8"
+    return f"{expr}::float8"
+
+
+@lru_cache(maxsize=config.TABLE_STATEMENT_CACHE_SIZE)
+def _facet_statement(
+    schema: str,
+    table: str,
+    filter_shape: tuple[tuple[str, str], ...],
+    columns: tuple[tuple[str, str], ...],
+) -> FacetStatement:
+    # One scan of the (filtered) table into a materialized CTE. Bounds come
+    # from one aggregate over it, then a single GROUPING SETS aggregate counts
+    # every column's values or histogram buckets at once.
+    where_clauses = metadata_service._filter_clauses(filter_shape)
+    where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    src_cols = ", ".join(f'"{name}" AS c{i}' for i, (name, _) in enumerate(columns))
+
+    bound_cols = ["count(*) AS total"]
+    group_exprs, value_cols, bucket_cols = [], [], []
+    for i, (_, category) in enumerate(columns):
+        bound_cols.append(f"count(c{i}) AS n{i}")
+        if category in RANGE_TYPES:
+            bound_cols += [f"min(c{i}) AS lo{i}", f"max(c{i}) AS hi{i}"]
+            lo, hi = _epoch(f"b.lo{i}", category), _epoch(f"b.hi{i}", category)
+            # width_bucket needs finite, distinct bounds and puts the max in
+            # bucket n+1; a single distinct value lands in bucket 1.
+            group_exprs.append(
+                f"CASE WHEN s.c{i} IS NULL OR NOT ({lo} > '-infinity' AND {hi} < 'infinity') THEN NULL"
+                f" WHEN {lo} = {hi} THEN 1"
+                f" ELSE least(width_bucket({_epoch(f's.c{i}', category)}, {lo}, {hi}, :buckets), :buckets)"
+                f" END AS g{i}"
+            )
+            bucket_cols.append(f"g{i}")
+        else:
+            group_exprs.append(f"s.c{i}::text AS g{i}")
+            value_cols.append(f"g{i}")
+
+    # Outside its own grouping set a column's g is NULL, so COALESCE picks the
+    # grouped one.
+    group_cols = [f"g{i}" for i in range(len(columns))]
+    value_sql = f"COALESCE({', '.join(value_cols)}, NULL)" if value_cols else "NULL::text"
+    bucket_sql = f"COALESCE({', '.join(bucket_cols)}, NULL)" if bucket_cols else "NULL::int"
+
+    sql = f"""
+        WITH src AS MATERIALIZED (
+            SELECT {src_cols} FROM "{schema}"."{table}"{where_sql}
+        ),
+        bounds AS (
+            SELECT {', '.join(bound_cols)} FROM src
+        ),
+        grouped AS (
+            SELECT GROUPING({', '.join(group_cols)}) AS gset,
+                   {value_sql} AS value, {bucket_sql} AS bucket, count(*) AS cnt
+            FROM (SELECT {', '.join(group_exprs)} FROM src s CROSS JOIN bounds b) g
+            GROUP BY GROUPING SETS ({', '.join(f'({g})' for g in group_cols)})
+        ),
+        ranked AS (
+            SELECT gset, value, bucket, cnt,
+                   row_number() OVER (PARTITION BY gset ORDER BY cnt DESC, value) AS rn,
+                   count(*) OVER (PARTITION BY gset) AS distinct_values
+            FROM grouped
+            WHERE value IS NOT NULL OR bucket IS NOT NULL
+        )
+        SELECT b.*, r.gset, r.value, r.bucket, r.cnt, r.distinct_values
+        FROM bounds b
+        LEFT JOIN ranked r ON r.bucket IS NOT NULL OR r.rn <= :top
+    """
+    # GROUPING(g0..gk) sets a bit (g0 most significant) for each column that is
+    # NOT grouped, so column i's set has every bit but its own.
+    k = len(columns)
+    masks = tuple(((1 << k) - 1) ^ (1 << (k - 1 - i)) for i in range(k))
+    return FacetStatement(sql=text(sql), masks=masks)
+
+
+def _to_epoch(v: Any) -> float:
+    if isinstance(v, datetime):
+        return (v if v.tzinfo else v.replace(tzinfo=timezone.utc)).timestamp()
+    if isinstance(v, date):
+        return datetime(v.year, v.month, v.day, tzinfo=timezone.utc).timestamp()
+    return float(v)
+
+
+def _from_epoch(e: float, like: Any) -> Any:
+    if isinstance(like, datetime):
+        dt = datetime.fromtimestamp(e, timezone.utc)
+        return (dt if like.tzinfo else dt.replace(tzinfo=None)).isoformat()
+    if isinstance(like, date):
+        return datetime.fromtimestamp(e, timezone.utc).date().isoformat()
+    return e
+
+
+def _json_value(v: Any) -> Any:
+    return v.isoformat() if isinstance(v, (date, datetime)) else v
+
+
+def _histogram(lo: Any, hi: Any, counts: dict[int, int], buckets: int) -> Optional[list[dict[str, Any]]]:
+    if lo is None:
+        return []
+    lo_e, hi_e = _to_epoch(lo), _to_epoch(hi)
+    if not (math.isfinite(lo_e) and math.isfinite(hi_e)):
+        return None
+    if lo_e == hi_e:
+        return [{"from": _json_value(lo), "to": _json_value(hi), "count": counts.get(1, 0)}]
+    width = (hi_e - lo_e) / buckets
+    return [
+        {
+            "from": _from_epoch(lo_e + (b - 1) * width, lo),
+            "to": _from_epoch(hi_e if b == buckets else lo_e + b * width, lo),
+            "count": counts.get(b, 0),
+        }
+        for b in range(1, buckets + 1)
+    ]
+
+
+async def get_table_facets(
+    schema: str,
+    table: str,
+    columns: Optional[str],
+    filters: Optional[str],
+    top: int,
+    buckets: int,
+) -> dict[str, Any]:
+    key = (schema, table, columns, metadata_service._filters_key(filters), top, buckets)
+    return await coalesce_service.run("facets", key, lambda: _get_table_facets(
+        schema, table, columns, filters, top, buckets,
+    ))
+
+
+async def _get_table_facets(
+    schema: str,
+    table: str,
+    columns: Optional[str],
+    filters: Optional[str],
+    top: int,
+    buckets: int,
+) -> dict[str, Any]:
+    table_label = metrics.table_label(schema, table)
+    with metrics.stage("facets", "catalog_lookup", table_label):
+        db_cols, _, _, col_map = await metadata_service._resolve_table_columns(schema, table, True)
+
+    if columns:
+        wanted = list(dict.fromkeys(c.strip() for c in columns.split(",") if c.strip()))
+        for c in wanted:
+            if c not in db_cols:
+                raise HTTPException(status_code=400, detail=f"Unknown column: {c}")
+    else:
+        wanted = db_cols
+    if not wanted:
+        raise HTTPException(status_code=400, detail="No columns to facet")
+    if len(wanted) > config.FACETS_MAX_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.FACETS_MAX_COLUMNS} columns per facets request",
+        )
+
+    parsed_filters = metadata_service._parse_filters(filters, db_cols, col_map)
+    filter_shape = tuple((field, op) for field, op, _ in parsed_filters)
+    faceted = tuple((c, col_map[c]["type"]) for c in wanted)
+    statement = _facet_statement(schema, table, filter_shape, faceted)
+    params = {**metadata_service._filter_params(parsed_filters), "top": top, "buckets": buckets}
+
+    with metrics.stage("facets", "data_query", table_label):
+        rows = await query_repository.execute_facet_query(
+            statement.sql, params, config.FACETS_STATEMENT_TIMEOUT
+        )
+
+    first = rows[0]
+    by_set: dict[int, list[Any]] = {}
+    for r in rows:
+        if r["gset"] is not None:
+            by_set.setdefault(r["gset"], []).append(r)
+
+    facets = {}
+    for i, (name, category) in enumerate(faceted):
+        groups = by_set.get(statement.masks[i], [])
+        non_null = first[f"n{i}"]
+        facet: dict[str, Any] = {"type": category, "count": non_null, "nulls": first["total"] - non_null}
+        if category in RANGE_TYPES:
+            lo, hi = first[f"lo{i}"], first[f"hi{i}"]
+            facet["min"] = _json_value(lo)
+            facet["max"] = _json_value(hi)
+            facet["histogram"] = _histogram(lo, hi, {g["bucket"]: g["cnt"] for g in groups}, buckets)
+        else:
+            groups.sort(key=lambda g: (-g["cnt"], g["value"]))
+            facet["distinct"] = groups[0]["distinct_values"] if groups else 0
+            facet["values"] = [
+                {"value": g["value"] == "true" if category == "boolean" else g["value"], "count": g["cnt"]}
+                for g in groups
+            ]
+            facet["other"] = non_null - sum(g["cnt"] for g in groups)
+        facets[name] = facet
+
+    return {
+        "table": f"{schema}.{table}",
+        "total": first["total"],
+        "facets": facets,
+    }
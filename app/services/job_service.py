@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Union
+from fastapi import HTTPException
+
+from app.core import config
+from app.services import admission_service, cancel_service, session_service
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@dataclass
+class QueryJob:
+    job_id: str
+    sql_key: str
+    inner_sql: str
+    request_class: str
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+    outcome: Optional[str] = None
+    error: Optional[str] = None
+    total_rows: Optional[int] = None
+    cancel_requested: bool = False
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def status(self) -> str:
+        if self.outcome is not None:
+            if self.outcome == "succeeded" and session_service.get_session(self.job_id) is None:
+                return "expired"
+            return self.outcome
+        # The job's backend is registered once it holds an admission slot.
+        return "running" if self.job_id in cancel_service.QUERY_PIDS else "queued"
+
+    def describe(self) -> dict[str, Any]:
+        end = self.finished if self.finished is not None else time.monotonic()
+        rows = self.total_rows
+        if rows is None:
+            session = session_service.get_session(self.job_id)
+            rows = session.total_rows if session else 0
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "request_class": self.request_class,
+            "created_at": self.created_at.isoformat(),
+            "elapsed_s": round(end - self.started, 3),
+            "rows": rows,
+            "error": self.error,
+        }
+
+
+@dataclass
+class JobRecord:
+    # A job accepted by another worker, as read from its shared record.
+    record: dict[str, Any]
+
+    @property
+    def job_id(self) -> str:
+        return self.record["job_id"]
+
+    @property
+    def owner_alive(self) -> bool:
+        return session_service._pid_alive(self.record["owner"])
+
+    @property
+    def status(self) -> str:
+        status = self.record["status"]
+        if status in ACTIVE_STATUSES and not self.owner_alive:
+            return "failed"
+        if status == "succeeded" and not Path(self.record["result"]["path"]).exists():
+            return "expired"
+        return status
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.record["status"] in ACTIVE_STATUSES and not self.owner_alive:
+            return "The worker running the job exited"
+        return self.record["error"]
+
+    def describe(self) -> dict[str, Any]:
+        elapsed = self.record["elapsed_s"]
+        if elapsed is None:
+            elapsed = round(time.time() - self.record["created_ts"], 3)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "request_class": self.record["request_class"],
+            "created_at": self.record["created_at"],
+            "elapsed_s": elapsed,
+            # Rows of a running job are only known to the worker running it.
+            "rows": self.record["rows"] or 0,
+            "error": self.error,
+        }
+
+
+# job_id -> job; job ids double as query ids, so /query/cancel also reaches them.
+JOBS: dict[str, QueryJob] = {}
+
+# Every job also has a record under SESSION_DIR/jobs that the worker running it
+# keeps current, so any worker sharing SESSION_DIR can report its status, serve
+# its result pages, cancel it or delete it.
+CANCEL_POLL_INTERVAL = 1.0
+
+
+def _record_path(job_id: str) -> Path:
+    # Job ids come from clients; the file name is a digest of the id.
+    name = hashlib.sha256(job_id.encode("utf-8")).hexdigest()
+    return Path(config.SESSION_DIR) / "jobs" / f"{name}.json"
+
+
+def _cancel_marker(job_id: str) -> Path:
+    return _record_path(job_id).with_suffix(".cancel")
+
+
+def _write_record(job: QueryJob, status: Optional[str] = None) -> None:
+    session = session_service.get_session(job.job_id)
+    result = None
+    if job.outcome == "succeeded" and session is not None:
+        result = {
+            "path": str(session.path),
+            "keys": session.keys,
+            "total_rows": session.total_rows,
+            "offsets": session.offsets,
+        }
+    record = {
+        "job_id": job.job_id,
+        "owner": os.getpid(),
+        "status": status or job.outcome or "queued",
+        "request_class": job.request_class,
+        "created_at": job.created_at.isoformat(),
+        "created_ts": job.created_at.timestamp(),
+        "elapsed_s": None if job.finished is None else round(job.finished - job.started, 3),
+        "rows": job.total_rows,
+        "error": job.error,
+        "result": result,
+    }
+    path = _record_path(job.job_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written aside and renamed, so readers never see a partial record.
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(record))
+    os.replace(tmp, path)
+
+
+def _read_record(job_id: str) -> Optional[dict[str, Any]]:
+    try:
+        return json.loads(_record_path(job_id).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _remove_record(job_id: str) -> None:
+    _record_path(job_id).unlink(missing_ok=True)
+    _cancel_marker(job_id).unlink(missing_ok=True)
+
+
+def _cancel_requested(job: QueryJob) -> bool:
+    # A cancel through another worker may stop the backend before the marker
+    # is picked up.
+    return job.cancel_requested or _cancel_marker(job.job_id).exists()
+
+
+async def _watch_cancel(job: QueryJob) -> None:
+    # Cancels arriving at other workers leave a marker next to the record.
+    marker = _cancel_marker(job.job_id)
+    while job.outcome is None:
+        await asyncio.sleep(CANCEL_POLL_INTERVAL)
+        if marker.exists():
+            if request_cancel(job.job_id):
+                await cancel_service.cancel_query_by_id(job.job_id)
+            return
+
+
+async def _run(job: QueryJob) -> None:
+    watcher = asyncio.create_task(_watch_cancel(job))
+    try:
+        session = await session_service.open_session(
+            job.job_id, job.sql_key, job.inner_sql, job.request_class, idle_ttl=config.JOB_TTL,
+            on_start=lambda: _write_record(job, "running"),
+        )
+        job.total_rows = session.total_rows
+        job.outcome = "succeeded"
+    except asyncio.CancelledError:
+        job.outcome = "cancelled"
+    except HTTPException as e:
+        job.outcome = "cancelled" if _cancel_requested(job) else "failed"
+        job.error = str(e.detail)
+    except Exception as e:
+        job.outcome = "cancelled" if _cancel_requested(job) else "failed"
+        job.error = str(e) or type(e).__name__
+    finally:
+        job.finished = time.monotonic()
+        watcher.cancel()
+        _write_record(job)
+
+
+def submit_job(job_id: Optional[str], sql_key: str, inner_sql: str, request_class: str) -> QueryJob:
+    job_id = job_id or str(uuid.uuid4())
+    if job_id in JOBS or session_service.has_session(job_id) or _record_path(job_id).exists():
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already exists")
+    # Refuse now rather than accept a job that would fail on a full queue.
+    admission_service.controller_for(request_class).check_capacity()
+
+    job = QueryJob(job_id=job_id, sql_key=sql_key, inner_sql=inner_sql, request_class=request_class)
+    JOBS[job_id] = job
+    _write_record(job)
+    job.task = asyncio.create_task(_run(job))
+    return job
+
+
+def get_job(job_id: str) -> Union[QueryJob, JobRecord]:
+    job = JOBS.get(job_id)
+    if job is not None:
+        if job.outcome is None or _record_path(job_id).exists():
+            return job
+        # Deleted through another worker.
+        JOBS.pop(job_id, None)
+        session_service.close_session(job_id)
+    record = _read_record(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobRecord(record)
+
+
+def result_session(job: Union[QueryJob, JobRecord]) -> Optional[session_service.ResultSession]:
+    # The finished job's stored result, read in place even when another
+    # worker wrote it.
+    if isinstance(job, QueryJob):
+        return session_service.get_session(job.job_id)
+    result = job.record["result"]
+    if result is None:
+        return None
+    session = session_service.ResultSession(
+        query_id=job.job_id,
+        sql_key="",
+        path=Path(result["path"]),
+        keys=result["keys"],
+        total_rows=result["total_rows"],
+        offsets=result["offsets"],
+    )
+    session.ready.set()
+    return session
+
+
+def request_cancel(job_id: str) -> bool:
+    # Local half of a cancel: a job still waiting for a slot has no backend to
+    # signal, so its task is cancelled; a running one is stopped by
+    # pg_cancel_backend through cancel_service.
+    job = JOBS.get(job_id)
+    if job is None:
+        # Another worker's job: it picks the marker up in _watch_cancel.
+        record = _read_record(job_id)
+        if record is None or JobRecord(record).status not in ACTIVE_STATUSES:
+            return False
+        _cancel_marker(job_id).touch()
+        return True
+    if job.outcome is not None:
+        return False
+    job.cancel_requested = True
+    if job.job_id not in cancel_service.QUERY_PIDS and job.task is not None:
+        job.task.cancel()
+    return True
+
+
+async def cancel_job(job_id: str) -> dict[str, Any]:
+    job = get_job(job_id)
+    if request_cancel(job_id):
+        await cancel_service.cancel_query_by_id(job_id)
+    return job.describe()
+
+
+def delete_job(job_id: str) -> None:
+    job = get_job(job_id)
+    status = job.status
+    if status in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {status}")
+    if isinstance(job, JobRecord):
+        # The worker that ran it notices the missing record in get_job.
+        if job.record["result"] is not None:
+            Path(job.record["result"]["path"]).unlink(missing_ok=True)
+    JOBS.pop(job_id, None)
+    session_service.close_session(job_id)
+    _remove_record(job_id)
+
+
+def expire_jobs() -> int:
+    now = time.monotonic()
+    finished = sorted(
+        (j for j in JOBS.values() if j.finished is not None), key=lambda j: j.finished
+    )
+    expired = [j for j in finished if j.finished < now - config.JOB_TTL]
+    overflow = len(finished) - len(expired) - config.JOB_MAX_FINISHED
+    if overflow > 0:
+        expired += [j for j in finished if j not in expired][:overflow]
+    for job in expired:
+        JOBS.pop(job.job_id, None)
+        session_service.close_session(job.job_id)
+        _remove_record(job.job_id)
+    return len(expired) + _expire_orphaned_records()
+
+
+def _expire_orphaned_records() -> int:
+    # Records of jobs whose worker exited before expiring them itself.
+    removed = 0
+    cutoff = time.time() - config.JOB_TTL
+    for path in (Path(config.SESSION_DIR) / "jobs").glob("*.json"):
+        try:
+            record = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            continue
+        if record["created_ts"] < cutoff and not session_service._pid_alive(record["owner"]):
+            _remove_record(record["job_id"])
+            removed += 1
+    return removed
+
+
+async def reap_jobs() -> None:
+    while True:
+        await asyncio.sleep(max(config.JOB_TTL / 10, 1))
+        expire_jobs()
+
+
+def job_stats() -> dict[str, Any]:
+    by_status: dict[str, int] = {}
+    for job in JOBS.values():
+        by_status[job.status] = by_status.get(job.status, 0) + 1
+    return {"jobs": len(JOBS), "by_status": by_status, "ttl": config.JOB_TTL}
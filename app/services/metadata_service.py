@@ -1,11 +1,21 @@
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 import json
+import time
+from functools import lru_cache
 from pathlib import Path
-from fastapi import HTTPException
-from sqlalchemy import text
+from fastapi import HTTPException, Response
+from sqlalchemy import TextClause, text
+from sqlalchemy.ext.asyncio import AsyncConnection
 
+from app.core import config, metrics
+from app.core.database import read_engine
 from app.repositories import metadata_repository, query_repository
+from app.services import advisor_service, catalog_service, coalesce_service, count_service
+from app.utils.arrow import ARROW_MEDIA_TYPE, encode_record_batch
 from app.utils.cache import _columns_cache
+from app.utils.http_cache import etag_matches, weak_etag
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serialization import row_converter
 
 COLUMNS_PATH = Path("./columns.json")
 
@@ -41,150 +51,555 @@ def _cast_value(raw: Any, col_type: str) -> Any:
     return str(raw)
 
 
-async def get_table_details(
-    schema: str, 
-    table: str, 
-    limit: int, 
-    offset: int, 
-    sort_by: Optional[str], 
-    sort_dir: str, 
-    filters: Optional[str], 
-    auto_generate_schema: bool
-):
+async def _resolve_table_columns(schema: str, table: str, auto_generate_schema: bool):
     # Columns + types from DB
-    db_cols_with_types = await metadata_repository._get_table_columns_with_types(schema, table)
+    db_cols_with_types = await catalog_service.get_table_columns(schema, table)
     db_cols = [c["key"] for c in db_cols_with_types]
     type_map = {c["key"]: c["type"] for c in db_cols_with_types}
+    col_info = {c["key"]: c for c in db_cols_with_types}
 
     columns = load_columns_dynamic(db_cols, auto_generate_schema)
     for col in columns:
         col["type"] = type_map.get(col["key"], col.get("type", "string"))
 
     col_map = {c["key"]: c for c in columns}
+    return db_cols, col_info, columns, col_map
+
 
-    # -------- Sorting --------
+def _validate_sort(sort_by: Optional[str], db_cols: list[str], col_map: dict[str, dict[str, Any]]):
     if sort_by:
         if sort_by not in db_cols:
             raise HTTPException(status_code=400, detail=f"Unknown sort_by: {sort_by}")
         if not col_map.get(sort_by, {}).get("enableSorting", True):
             raise HTTPException(status_code=400, detail=f"Sorting disabled for: {sort_by}")
 
-    # -------- Filtering --------
-    where_clauses = []
-    bind_params = {}
-
-    if filters:
-        try:
-            filter_list = json.loads(filters)
-            if not isinstance(filter_list, list):
-                raise ValueError
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Filters must be a JSON array")
-
-        for idx, f in enumerate(filter_list):
-            field = f.get("field")
-            op = f.get("op")
-            value = f.get("value")
-
-            if not field or not op or value in {None, ""}:
-                continue
-
-            if field not in db_cols:
-                raise HTTPException(status_code=400, detail=f"Invalid filter field: {field}")
-
-            col_type = col_map[field]["type"]
-
-            allowed_ops = {
-                "string": {"eq", "contains", "starts_with", "ends_with"},
-                "number": {"eq", "gt", "gte", "lt", "lte"},
-                "boolean": {"eq"},
-                "date": {"eq", "gt", "gte", "lt", "lte"},
-                "datetime": {"eq", "gt", "gte", "lt", "lte"},
-            }
 
-            if op not in allowed_ops.get(col_type, {"eq"}):
+# op -> (SQL template, bind value template)
+_FILTER_SQL = {
+    "eq": ('"{field}" = :{p}', "{}"),
+    "gt": ('"{field}" > :{p}', "{}"),
+    "gte": ('"{field}" >= :{p}', "{}"),
+    "lt": ('"{field}" < :{p}', "{}"),
+    "lte": ('"{field}" <= :{p}', "{}"),
+    "contains": ('"{field}" ILIKE :{p}', "%{}%"),
+    "starts_with": ('"{field}" ILIKE :{p}', "{}%"),
+    "ends_with": ('"{field}" ILIKE :{p}', "%{}"),
+}
+
+
+class TableStatements(NamedTuple):
+    rows: TextClause
+    count_source: str
+
+
+def _parse_filters(
+    filters: Optional[str],
+    db_cols: list[str],
+    col_map: dict[str, dict[str, Any]],
+) -> list[tuple[str, str, Any]]:
+    if not filters:
+        return []
+
+    try:
+        filter_list = json.loads(filters)
+        if not isinstance(filter_list, list):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Filters must be a JSON array")
+
+    parsed = []
+    for f in filter_list:
+        field = f.get("field")
+        op = f.get("op")
+        value = f.get("value")
+
+        if not field or not op or value in {None, ""}:
+            continue
+
+        if field not in db_cols:
+            raise HTTPException(status_code=400, detail=f"Invalid filter field: {field}")
+
+        col_type = col_map[field]["type"]
+
+        allowed_ops = {
+            "string": {"eq", "contains", "starts_with", "ends_with"},
+            "number": {"eq", "gt", "gte", "lt", "lte"},
+            "boolean": {"eq"},
+            "date": {"eq", "gt", "gte", "lt", "lte"},
+            "datetime": {"eq", "gt", "gte", "lt", "lte"},
+        }
+
+        if op not in allowed_ops.get(col_type, {"eq"}):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Operator '{op}' not valid for {col_type}",
+            )
+
+        parsed.append((field, op, value))
+
+    # Canonical order: the same set of (field, op) pairs always yields the same
+    # SQL text, whatever order the client sent them in.
+    parsed.sort(key=lambda f: (f[0], f[1]))
+    return parsed
+
+
+def _filter_clauses(shape: tuple[tuple[str, str], ...]) -> list[str]:
+    return [_FILTER_SQL[op][0].format(field=field, p=f"p{i}") for i, (field, op) in enumerate(shape)]
+
+
+def _filter_params(parsed: list[tuple[str, str, Any]]) -> dict[str, Any]:
+    params = {}
+    for i, (_, op, value) in enumerate(parsed):
+        template = _FILTER_SQL[op][1]
+        params[f"p{i}"] = value if template == "{}" else template.format(value)
+    return params
+
+
+def _build_filter_clauses(
+    filters: Optional[str],
+    db_cols: list[str],
+    col_map: dict[str, dict[str, Any]],
+    applied: Optional[list[tuple[str, str]]] = None,
+) -> tuple[list[str], dict[str, Any]]:
+    parsed = _parse_filters(filters, db_cols, col_map)
+    if applied is not None:
+        applied.extend((field, op) for field, op, _ in parsed)
+    return _filter_clauses(tuple((field, op) for field, op, _ in parsed)), _filter_params(parsed)
+
+
+def _build_seek_clause(
+    key_cols: tuple[str, ...],
+    db_types: tuple[str, ...],
+    sort_dir: str,
+    nullable_sort: bool,
+    first_null: bool,
+) -> str:
+    # Cursor values travel as text and are cast back server-side, so the
+    # comparison keeps the column type and can walk an index on key_cols.
+    # Binds are k0..kN in key_cols order; k0 is absent when first_null.
+    cmp = ">" if sort_dir == "asc" else "<"
+    casts = [f"CAST(CAST(:k{i} AS text) AS {t})" for i, t in enumerate(db_types)]
+
+    def row_cmp(cols: tuple[str, ...], exprs: list[str]) -> str:
+        lhs = ", ".join(f'"{c}"' for c in cols)
+        return f"({lhs}) {cmp} ({', '.join(exprs)})"
+
+    if not nullable_sort:
+        return row_cmp(key_cols, casts)
+
+    # NULL sort keys come last for ASC and first for DESC (Postgres default).
+    sort_col = key_cols[0]
+    if first_null:
+        clause = f'"{sort_col}" IS NULL AND {row_cmp(key_cols[1:], casts[1:])}'
+        if sort_dir == "desc":
+            clause = f'({clause}) OR "{sort_col}" IS NOT NULL'
+        return f"({clause})"
+
+    clause = row_cmp(key_cols, casts)
+    if sort_dir == "asc":
+        clause = f'{clause} OR "{sort_col}" IS NULL'
+    return f"({clause})"
+
+
+def _cursor_key_supported(udt: str) -> bool:
+    # Arrays and intervals have no text form the driver value round-trips to.
+    return not udt.startswith("_") and udt != "interval"
+
+
+def _cursor_value(v: Any, udt: str) -> Optional[str]:
+    # Postgres text input form of a key value, cast back by _build_seek_clause.
+    if v is None:
+        return None
+    if isinstance(v, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(v).hex()
+    if udt in ("json", "jsonb") and not isinstance(v, str):
+        return json.dumps(v)
+    return str(v)
+
+
+@lru_cache(maxsize=config.TABLE_STATEMENT_CACHE_SIZE)
+def _table_statements(
+    schema: str,
+    table: str,
+    filter_shape: tuple[tuple[str, str], ...],
+    order_cols: tuple[str, ...],
+    sort_dir: str,
+    pagination: str,
+    seek: Optional[tuple[tuple[str, ...], bool, bool]] = None,
+    sample: Optional[tuple[str, bool]] = None,
+) -> TableStatements:
+    # One compiled statement per request shape. Values never reach the SQL
+    # text, so every request of a shape sends identical text and reuses the
+    # connection's asyncpg prepared statement (parse/plan once per backend).
+    relation = f'"{schema}"."{table}"'
+    if sample is not None:
+        # (method, repeatable); the percentage and seed are binds.
+        method, repeatable = sample
+        relation += f" TABLESAMPLE {method.upper()} (:sample_pct)"
+        if repeatable:
+            relation += " REPEATABLE (:sample_seed)"
+    where_clauses = _filter_clauses(filter_shape)
+    where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    order_sql = (
+        " ORDER BY " + ", ".join(f'"{c}" {sort_dir.upper()}' for c in order_cols)
+        if order_cols else ""
+    )
+
+    if pagination == "cursor":
+        if seek is not None:
+            db_types, nullable_sort, first_null = seek
+            seek_sql = _build_seek_clause(order_cols, db_types, sort_dir, nullable_sort, first_null)
+            where_clauses = [*where_clauses, seek_sql]
+        seek_where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        rows_sql = f"SELECT * FROM {relation}{seek_where_sql}{order_sql} LIMIT :limit"
+    else:
+        rows_sql = f"SELECT * FROM {relation}{where_sql}{order_sql} LIMIT :limit OFFSET :offset"
+
+    return TableStatements(rows=text(rows_sql), count_source=f"SELECT * FROM {relation}{where_sql}")
+
+
+def statement_cache_stats() -> dict[str, Any]:
+    info = _table_statements.cache_info()
+    return {
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+    }
+
+
+def _sample_percent(
+    method: str,
+    target_rows: int,
+    reltuples: Optional[int],
+    relpages: int,
+    matching: Optional[int] = None,
+) -> float:
+    # Enough of the table to yield target_rows, with headroom for sampling
+    # variance. `matching` is the planner's estimate of rows passing the
+    # filters; the sample is scaled up by that selectivity. SYSTEM picks whole
+    # pages, so it also gets a floor of SAMPLE_MIN_PAGES pages. Without planner
+    # statistics the whole table is "sampled"; LIMIT still stops the scan early.
+    if not reltuples:
+        return 100.0
+    base = reltuples if matching is None else max(1, min(matching, reltuples))
+    pct = 100.0 * target_rows * config.SAMPLE_OVERSAMPLE / base
+    if method == "system" and relpages:
+        pct = max(pct, 100.0 * config.SAMPLE_MIN_PAGES / relpages)
+    return min(100.0, pct)
+
+
+async def _sampled_total(
+    count: str,
+    count_source: str,
+    params: dict[str, Any],
+    filtered: bool,
+    reltuples: Optional[int],
+    conn: Optional[AsyncConnection] = None,
+) -> Optional[int]:
+    if count == "none":
+        return None
+    if not filtered and reltuples is not None:
+        return reltuples
+    # Matches in the sample, scaled up by the sampled fraction.
+    sampled = await count_service.count_rows("exact", count_source, params, conn=conn)
+    return round(sampled * 100.0 / params["sample_pct"])
+
+
+def _filters_key(filters: Optional[str]) -> Any:
+    # Same filters in any order, with or without skipped (empty) entries, give
+    # the same key. Anything unparseable keys on the raw text and fails in the
+    # leader like it would on its own.
+    if not filters:
+        return ()
+    try:
+        filter_list = json.loads(filters)
+    except ValueError:
+        return filters
+    if not isinstance(filter_list, list) or not all(isinstance(f, dict) for f in filter_list):
+        return filters
+    return tuple(sorted(
+        json.dumps(f, sort_keys=True, default=str)
+        for f in filter_list
+        if f.get("field") and f.get("op") and f.get("value") not in (None, "")
+    ))
+
+
+async def get_table_details(
+    schema: str,
+    table: str,
+    limit: int,
+    offset: int,
+    sort_by: Optional[str],
+    sort_dir: str,
+    filters: Optional[str],
+    auto_generate_schema: bool,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    output: str = "json",
+    sample: Optional[str] = None,
+    seed: Optional[float] = None,
+    if_none_match: Optional[str] = None,
+) -> tuple[Any, Optional[str]]:
+    # Returns (result, etag); result is None when If-None-Match matched.
+    # Identical pages requested while one is being built share its result.
+    # If-None-Match is part of the key, so a 304 is only shared with callers
+    # that sent the same validator.
+    # sort_dir is only ignored for an unsorted offset page; cursor pages
+    # always order by their key columns (sort_by, then the primary key).
+    mode = "cursor" if cursor else pagination
+    direction = sort_dir if sort_by or mode == "cursor" else "asc"
+    key = (
+        schema, table, _filters_key(filters), sort_by, direction,
+        limit, offset, mode, cursor, count, output,
+        auto_generate_schema, sample, seed,
+    )
+    result, etag = await coalesce_service.run("table", (*key, if_none_match), lambda: _get_table_details(
+        schema, table, limit, offset, sort_by, sort_dir, filters, auto_generate_schema,
+        pagination, cursor, count, output, sample, seed, key, if_none_match,
+    ))
+    if isinstance(result, Response):
+        # Each caller gets its own Response object around the shared body.
+        return Response(content=result.body, media_type=result.media_type), etag
+    return result, etag
+
+
+async def _get_table_details(
+    schema: str, 
+    table: str, 
+    limit: int, 
+    offset: int, 
+    sort_by: Optional[str], 
+    sort_dir: str, 
+    filters: Optional[str], 
+    auto_generate_schema: bool,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    output: str = "json",
+    sample: Optional[str] = None,
+    seed: Optional[float] = None,
+    request_key: tuple = (),
+    if_none_match: Optional[str] = None,
+):
+    table_label = metrics.table_label(schema, table)
+    with metrics.stage("table", "catalog_lookup", table_label):
+        db_cols, col_info, columns, col_map = await _resolve_table_columns(
+            schema, table, auto_generate_schema
+        )
+    _validate_sort(sort_by, db_cols, col_map)
+
+    # -------- Filtering --------
+    parsed_filters = _parse_filters(filters, db_cols, col_map)
+    filter_shape = tuple((field, op) for field, op, _ in parsed_filters)
+    bind_params = _filter_params(parsed_filters)
+
+    # -------- Keyset pagination --------
+    if cursor:
+        pagination = "cursor"
+
+    # -------- Sampled preview --------
+    sample_spec = None
+    reltuples = None
+    if sample:
+        if pagination == "cursor":
+            raise HTTPException(status_code=400, detail="sample cannot be combined with cursor pagination")
+        reltuples, relpages = await query_repository.get_table_size_estimate(schema, table)
+        sample_spec = (sample, seed is not None)
+        matching = None
+        if filter_shape and reltuples:
+            unsampled = _table_statements(schema, table, filter_shape, (), "asc", "offset")
+            matching = await count_service.count_rows("estimated", unsampled.count_source, bind_params)
+        # The sample has to reach past the offset, not just hold one page.
+        bind_params["sample_pct"] = _sample_percent(
+            sample, offset + limit + 1, reltuples, relpages, matching
+        )
+        if seed is not None:
+            bind_params["sample_seed"] = seed
+    # A sampled total is always an estimate, so has_more comes from an extra row.
+    exact_total = count == "exact" and not sample
+
+    key_cols: list[str] = []
+    if pagination == "cursor":
+        with metrics.stage("table", "catalog_lookup", table_label):
+            pk_cols = await catalog_service.get_primary_key_columns(schema, table)
+        if not pk_cols:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination requires a primary key on {schema}.{table}",
+            )
+        key_cols = ([sort_by] if sort_by else []) + [c for c in pk_cols if c != sort_by]
+        for c in key_cols:
+            if not _cursor_key_supported(col_info[c]["udt"]):
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Operator '{op}' not valid for {col_type}",
+                    detail=f"Cursor pagination does not support keys of type {col_info[c]['udt']}: {c}",
                 )
 
-            p = f"p{idx}"
-
-            if op == "eq":
-                where_clauses.append(f'"{field}" = :{p}')
-                bind_params[p] = value
-            elif op in {"gt", "gte", "lt", "lte"}:
-                sym = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}[op]
-                where_clauses.append(f'"{field}" {sym} :{p}')
-                bind_params[p] = value
-            elif op == "contains":
-                where_clauses.append(f'"{field}" ILIKE :{p}')
-                bind_params[p] = f"%{value}%"
-            elif op == "starts_with":
-                where_clauses.append(f'"{field}" ILIKE :{p}')
-                bind_params[p] = f"{value}%"
-            elif op == "ends_with":
-                where_clauses.append(f'"{field}" ILIKE :{p}')
-                bind_params[p] = f"%{value}"
+        seek = None
+        seek_params: dict[str, Any] = {}
+        if cursor:
+            state = decode_cursor(cursor)
+            if (
+                state.get("sort_by") != sort_by
+                or state.get("sort_dir") != sort_dir
+                or len(state["k"]) != len(key_cols)
+            ):
+                raise HTTPException(status_code=400, detail="Cursor does not match sort_by/sort_dir")
+            if not all(v is None or isinstance(v, str) for v in state["k"]):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            nullable_sort = bool(sort_by) and col_info[sort_by]["nullable"]
+            first_null = nullable_sort and state["k"][0] is None
+            seek = (tuple(col_info[c]["db_type"] for c in key_cols), nullable_sort, first_null)
+            seek_params = {
+                f"k{i}": v for i, v in enumerate(state["k"]) if not (i == 0 and first_null)
+            }
 
-    where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-    order_sql = f' ORDER BY "{sort_by}" {sort_dir.upper()}' if sort_by else ""
+        statements = _table_statements(
+            schema, table, filter_shape, tuple(key_cols), sort_dir, "cursor", seek
+        )
+        # One extra row tells us whether another page exists.
+        row_params = {**bind_params, **seek_params, "limit": limit + 1}
+    else:
+        statements = _table_statements(
+            schema, table, filter_shape,
+            (sort_by,) if sort_by else (), sort_dir if sort_by else "asc", "offset",
+            None, sample_spec,
+        )
+        # Without an exact total, has_more comes from fetching one extra row.
+        fetch_limit = limit if exact_total else limit + 1
+        row_params = {**bind_params, "limit": fetch_limit, "offset": offset}
+
+    # Execute. The validator, count and data share one connection, so with
+    # read replicas they all come from the same server.
+    started = time.perf_counter()
+    async with read_engine("grid").connect() as conn:
+        # -------- Conditional request --------
+        # Unseeded samples differ on every request, so they get no validator.
+        etag = None
+        if config.ETAG_ENABLED and not (sample and seed is None):
+            version = await query_repository.get_table_version(schema, table, conn=conn)
+            if version is not None:
+                # The epoch rolls the ETag over every TABLE_ETAG_MAX_AGE seconds,
+                # bounding how long a late statistics flush can hide a change.
+                epoch = int(time.time() // config.TABLE_ETAG_MAX_AGE) if config.TABLE_ETAG_MAX_AGE else 0
+                etag = weak_etag((request_key, version, columns, epoch))
+                if etag_matches(if_none_match, etag):
+                    return None, etag
+
+        with metrics.stage("table", "count_query", table_label):
+            if sample:
+                total = await _sampled_total(
+                    count, statements.count_source, bind_params, bool(filter_shape), reltuples, conn
+                )
+            else:
+                total = await count_service.count_rows(
+                    count,
+                    statements.count_source,
+                    bind_params,
+                    relation=None if filter_shape else (schema, table),
+                    conn=conn,
+                )
 
-    sql_rows = text(
-        f'SELECT * FROM "{schema}"."{table}"{where_sql}{order_sql} LIMIT :limit OFFSET :offset'
+        with metrics.stage("table", "data_query", table_label):
+            rows_res = await query_repository.execute_data_query(statements.rows, row_params, conn=conn)
+            keys = tuple(rows_res.keys())
+            rows = rows_res.all()
+    advisor_service.record_table_access(
+        schema, table, list(filter_shape), sort_by, time.perf_counter() - started
     )
-    sql_count = text(f'SELECT COUNT(*) FROM "{schema}"."{table}"{where_sql}')
-
-    # Execute
-    total = await query_repository.execute_count_query(sql_count, bind_params)
-    
-    rows_res = await query_repository.execute_data_query(
-        sql_rows, 
-        {**bind_params, "limit": limit, "offset": offset}
-    )
-    rows = rows_res.mappings().all()
 
-    data = []
-    for r in rows:
-        row = {}
-        for k, v in r.items():
-            row[k] = _cast_value(v, col_map[k]["type"])
-        data.append(row)
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+    elif exact_total and pagination != "cursor":
+        has_more = (offset + len(rows)) < total
+
+    next_cursor = None
+    if pagination == "cursor" and has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor({
+            "sort_by": sort_by,
+            "sort_dir": sort_dir,
+            "k": [_cursor_value(last[c], col_info[c]["udt"]) for c in key_cols],
+        })
+
+    meta = {
+        "total": total,
+        "count_mode": "estimated" if sample and count != "none" else count,
+        "has_more": has_more,
+        "limit": limit,
+        "offset": offset,
+        "table": f"{schema}.{table}",
+    }
+    if pagination == "cursor":
+        meta["pagination"] = "cursor"
+        meta["next_cursor"] = next_cursor
+    if sample:
+        meta["sample"] = {"method": sample, "percent": bind_params["sample_pct"], "seed": seed}
+
+    metrics.count_rows("table", len(rows), table_label)
+
+    if output == "arrow":
+        # Column-wise batches straight from the DB values; no per-cell casting.
+        with metrics.stage("table", "arrow_encode", table_label):
+            body = encode_record_batch(
+                names=list(keys),
+                pg_types=[col_info[k]["udt"] for k in keys],
+                categories=[col_map[k]["type"] for k in keys],
+                rows=rows,
+                metadata={"meta": meta, "columns": columns},
+            )
+        return Response(content=body, media_type=ARROW_MEDIA_TYPE), etag
+
+    with metrics.stage("table", "row_conversion", table_label):
+        convert_row = row_converter(
+            keys,
+            tuple(col_map[k]["type"] for k in keys),
+            tuple(col_info[k]["udt"] for k in keys),
+        )
+        data = [convert_row(r) for r in rows]
 
     return {
         "columns": columns,
         "data": data,
-        "meta": {
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "table": f"{schema}.{table}",
-        },
-    }
+        "meta": meta,
+    }, etag
+
+def _metadata(kind: str, fetch, *args):
+    # Concurrent identical catalog reads share one query.
+    return coalesce_service.run("metadata", (kind, *args), lambda: fetch(*args))
+
+async def get_catalog_version(schema: Optional[str] = None, table: Optional[str] = None):
+    return await _metadata("version", metadata_repository._get_catalog_version, schema, table)
 
 async def get_pg_schemas():
-    return await metadata_repository._get_pg_schemas()
+    return await _metadata("schemas", metadata_repository._get_pg_schemas)
 
 async def get_pg_tables(schema: str):
-    return await metadata_repository._get_pg_tables(schema)
+    return await _metadata("tables", metadata_repository._get_pg_tables, schema)
 
 async def get_pg_views(schema: str):
-    return await metadata_repository._get_pg_views(schema)
+    return await _metadata("views", metadata_repository._get_pg_views, schema)
 
 async def get_pg_matviews(schema: str):
-    return await metadata_repository._get_pg_matviews(schema)
+    return await _metadata("matviews", metadata_repository._get_pg_matviews, schema)
 
 async def get_pg_indexes(schema: str):
-    return await metadata_repository._get_pg_indexes(schema)
+    return await _metadata("indexes", metadata_repository._get_pg_indexes, schema)
 
 async def get_pg_sequences(schema: str):
-    return await metadata_repository._get_pg_sequences(schema)
+    return await _metadata("sequences", metadata_repository._get_pg_sequences, schema)
 
 async def get_pg_datatypes(schema: str):
-    return await metadata_repository._get_pg_datatypes(schema)
+    return await _metadata("datatypes", metadata_repository._get_pg_datatypes, schema)
 
 async def get_pg_functions(schema: str):
-    return await metadata_repository._get_pg_functions(schema)
+    return await _metadata("functions", metadata_repository._get_pg_functions, schema)
 
 async def get_pg_columns(schema: str, table: str):
-    return await metadata_repository._get_pg_columns(schema, table)
+    return await _metadata("columns", metadata_repository._get_pg_columns, schema, table)
+
+async def get_pg_schema_overview(schema: str):
+    return {"schema": schema, **await _metadata("overview", metadata_repository._get_pg_schema_overview, schema)}
@@ -0,0 +1,110 @@
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.database import REPLICAS, pool_status
+from app.core.metrics import REGISTRY
+from app.services import (
+    admission_service, cancel_service, catalog_service, coalesce_service, metadata_service,
+    query_service,
+)
+
+
+class RuntimeCollector:
+    # Reads live state at scrape time instead of updating gauges on every
+    # checkout or query, so the request path pays nothing for these.
+    def collect(self):
+        pools = pool_status()
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently checked out.", labels=["pool"]
+        )
+        capacity = GaugeMetricFamily(
+            "db_pool_capacity", "Pool size plus max overflow.", labels=["pool"]
+        )
+        timeouts = CounterMetricFamily(
+            "db_pool_timeouts", "Checkouts that hit the pool timeout.", labels=["pool"]
+        )
+        for name, s in pools.items():
+            checked_out.add_metric([name], s["checked_out"])
+            capacity.add_metric([name], s["size"] + max(s["max_overflow"], 0))
+            timeouts.add_metric([name], s["timeouts"])
+        yield checked_out
+        yield capacity
+        yield timeouts
+
+        if REPLICAS:
+            healthy = GaugeMetricFamily(
+                "db_replica_healthy", "1 if the replica is in read rotation.", labels=["replica"]
+            )
+            lag = GaugeMetricFamily(
+                "db_replica_lag_seconds", "Replay lag at the last check.", labels=["replica"]
+            )
+            for r in REPLICAS:
+                healthy.add_metric([r.name], 1 if r.healthy else 0)
+                if r.lag is not None:
+                    lag.add_metric([r.name], r.lag)
+            yield healthy
+            yield lag
+
+        yield GaugeMetricFamily(
+            "app_inflight_queries",
+            "Queries and exports tracked for cancellation in this process.",
+            value=len(cancel_service.QUERY_PIDS),
+        )
+
+        running = GaugeMetricFamily(
+            "app_admission_running", "Admitted ad-hoc queries running.", labels=["request_class"]
+        )
+        queued = GaugeMetricFamily(
+            "app_admission_queued", "Ad-hoc queries waiting for a slot.", labels=["request_class"]
+        )
+        rejected = CounterMetricFamily(
+            "app_admission_rejected", "Ad-hoc queries answered with 429.", labels=["request_class"]
+        )
+        for name, s in admission_service.admission_stats().items():
+            running.add_metric([name], s["running"])
+            queued.add_metric([name], s["queued"])
+            rejected.add_metric([name], s["rejected"] + s["timed_out"])
+        yield running
+        yield queued
+        yield rejected
+
+        coalesced = CounterMetricFamily(
+            "app_coalesced_requests",
+            "Requests that ran the work (leader) or shared an in-flight result (follower).",
+            labels=["route", "role"],
+        )
+        saved = CounterMetricFamily(
+            "app_coalesced_statements_saved",
+            "DB statements not executed because followers shared a leader's result.",
+            labels=["route"],
+        )
+        for route, s in coalesce_service.COALESCE_STATS.items():
+            coalesced.add_metric([route, "leader"], s.leaders)
+            coalesced.add_metric([route, "follower"], s.followers)
+            saved.add_metric([route], s.statements_saved)
+        yield coalesced
+        yield saved
+        yield GaugeMetricFamily(
+            "app_coalesce_in_flight",
+            "Distinct coalesced requests currently executing.",
+            value=len(coalesce_service.FLIGHTS),
+        )
+
+        hits = CounterMetricFamily("app_cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("app_cache_misses", "Cache misses.", labels=["cache"])
+        for name, s in (
+            ("catalog", catalog_service.cache_stats()),
+            ("query_result", query_service.result_cache_stats()),
+            ("table_statements", metadata_service.statement_cache_stats()),
+        ):
+            hits.add_metric([name], s["hits"])
+            misses.add_metric([name], s["misses"])
+        yield hits
+        yield misses
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
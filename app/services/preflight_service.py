@@ -0,0 +1,113 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.core import config, metrics
+from app.repositories import query_repository
+
+
+@dataclass(frozen=True)
+class PlanEstimate:
+    # Planner cost units and rows for the requested page (the LIMIT node) and
+    # for the full inner query, which is what an exact count or a result
+    # session walks.
+    page_cost: float
+    page_rows: int
+    total_cost: float
+    total_rows: int
+
+
+def wrap_query(inner_sql: str, limit: int, offset: int) -> str:
+    # Same shape as the statement /query runs, with the page inlined so the
+    # planner costs the LIMIT with real values instead of a generic guess.
+    return f"""
+        SELECT * FROM (
+            {inner_sql}
+        ) AS limited_query
+        LIMIT {int(limit)} OFFSET {int(offset)}
+    """
+
+
+def estimate_from_plan(plan: list[dict[str, Any]]) -> PlanEstimate:
+    top = plan[0]["Plan"]
+    inner = top["Plans"][0] if top["Node Type"] == "Limit" and top.get("Plans") else top
+    return PlanEstimate(
+        page_cost=float(top["Total Cost"]),
+        page_rows=int(top["Plan Rows"]),
+        total_cost=float(inner["Total Cost"]),
+        total_rows=int(inner["Plan Rows"]),
+    )
+
+
+# EXPLAINs run before admission but on the `adhoc` pool; this caps how many
+# connections they can take from it.
+_explain_slots = asyncio.Semaphore(config.PREFLIGHT_MAX_CONCURRENCY)
+
+
+async def explain(inner_sql: str, limit: int, offset: int) -> list[dict[str, Any]]:
+    async with _explain_slots:
+        return await query_repository.explain_query(
+            wrap_query(inner_sql, limit, offset), config.PREFLIGHT_TIMEOUT
+        )
+
+
+def evaluate(estimate: PlanEstimate, full_result: bool, request_class: str) -> dict[str, Any]:
+    cost = estimate.total_cost if full_result else estimate.page_cost
+    rows = estimate.total_rows if full_result else estimate.page_rows
+
+    def over(value: float, limit: float) -> bool:
+        return limit > 0 and value > limit
+
+    decision, reason = "run", None
+    if over(cost, config.PREFLIGHT_REJECT_COST):
+        decision = "reject"
+        reason = f"Estimated cost {cost:.0f} exceeds the limit of {config.PREFLIGHT_REJECT_COST:.0f}"
+    elif over(rows, config.PREFLIGHT_REJECT_ROWS):
+        decision = "reject"
+        reason = f"Estimated rows {rows} exceed the limit of {config.PREFLIGHT_REJECT_ROWS:.0f}"
+    elif request_class != "batch" and (
+        over(cost, config.PREFLIGHT_QUEUE_COST) or over(rows, config.PREFLIGHT_QUEUE_ROWS)
+    ):
+        decision, request_class = "queue", "batch"
+
+    return {
+        "decision": decision,
+        "request_class": request_class,
+        "cost": cost,
+        "rows": rows,
+        "reason": reason,
+    }
+
+
+async def preflight(
+    inner_sql: str, limit: int, offset: int, full_result: bool, request_class: str
+) -> tuple[PlanEstimate, str]:
+    # Runs before admission, so a rejected query never takes a query slot or
+    # any executor time; only the planner sees it.
+    with metrics.stage("query", "preflight"):
+        estimate = estimate_from_plan(await explain(inner_sql, limit, offset))
+    verdict = evaluate(estimate, full_result, request_class)
+    metrics.count_preflight(verdict["decision"])
+    if verdict["decision"] == "reject":
+        raise HTTPException(
+            status_code=422,
+            detail=f"{verdict['reason']}; narrow the query or check it with /query/explain",
+        )
+    return estimate, verdict["request_class"]
+
+
+async def explain_report(
+    inner_sql: str, limit: int, offset: int, full_result: bool, request_class: str
+) -> dict[str, Any]:
+    plan = await explain(inner_sql, limit, offset)
+    estimate = estimate_from_plan(plan)
+    return {
+        "plan": plan,
+        "estimate": asdict(estimate),
+        "preflight": {
+            "enabled": config.PREFLIGHT_ENABLED,
+            **evaluate(estimate, full_result, request_class),
+        },
+    }
@@ -1,26 +1,200 @@
+import asyncio
 import uuid
+from contextlib import AsyncExitStack
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
-from fastapi import HTTPException
-from app.core.database import engine
-from app.repositories import query_repository
-from app.services import cancel_service
+from fastapi import HTTPException, Response
+from app.core import config, metrics
+from app.core.database import read_engine
+from app.services import admission_service, cancel_service, count_service, job_service, preflight_service, session_service
+from app.utils.arrow import ARROW_MEDIA_TYPE, PG_OID_TYPES, encode_record_batch
+from app.utils.cache import ByteBudgetCache
+from app.utils.serialization import dumps_line, row_converter
 from app.utils.sql_safety import _is_query_safe
+from app.utils.sql_text import normalize_sql
 
-async def execute_query_logic(query: str, limit: int, offset: int, client_query_id: str | None):
-    original_sql = query.strip()
-    query_id = client_query_id or str(uuid.uuid4())
+_checkout_lock = asyncio.Lock()
 
-    # 1. Safety Check
+async def _execute_session_page(
+    query_id: str, inner_sql: str, limit: int, offset: int, output: str, request_class: str
+):
+    try:
+        result_session = await session_service.open_session(
+            query_id, normalize_sql(inner_sql), inner_sql, request_class
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await _session_page(query_id, result_session, limit, offset, output)
+    except FileNotFoundError:
+        # Closed, evicted or expired while we read it.
+        raise HTTPException(status_code=410, detail=f"Session {query_id} was closed or has expired")
+
+async def _session_page(
+    query_id: str, result_session: session_service.ResultSession, limit: int, offset: int, output: str
+):
+    rows = await session_service.read_page(result_session, limit, offset)
+    keys = result_session.keys
+    total_rows = result_session.total_rows
+    row_count = len(rows)
+    has_more = (offset + row_count) < total_rows
+
+    if output == "arrow":
+        body = encode_record_batch(
+            names=keys,
+            pg_types=["text"] * len(keys),
+            categories=["string"] * len(keys),
+            rows=rows,
+            metadata={"meta": {
+                "row_count": row_count,
+                "total_rows": total_rows,
+                "count_mode": "exact",
+                "has_more": has_more,
+                "query_id": query_id,
+                "session": True,
+            }},
+        )
+        return Response(content=body, media_type=ARROW_MEDIA_TYPE)
+
+    return {
+        "columns": [{"key": k, "label": k, "type": "string"} for k in keys],
+        "data": [dict(zip(keys, r)) for r in rows],
+        "row_count": row_count,
+        "total_rows": total_rows,
+        "count_mode": "exact",
+        "has_more": has_more,
+        "query_id": query_id,
+        "cached": False,
+        "session": True,
+        "error": None
+    }
+
+def _check_safe(original_sql: str) -> None:
     if not _is_query_safe(original_sql):
         raise HTTPException(
             status_code=400, 
             detail="Query contains restricted keywords (e.g. INSERT, UPDATE, DROP) or multiple statements."
         )
+
+async def _preflight(inner_sql: str, limit: int, offset: int, full_result: bool, request_class: str):
+    try:
+        return await preflight_service.preflight(inner_sql, limit, offset, full_result, request_class)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def explain_query_logic(
+    query: str,
+    limit: int,
+    offset: int,
+    count: str = "exact",
+    session: bool = False,
+    request_class: str = "interactive",
+):
+    original_sql = query.strip()
+    _check_safe(original_sql)
+    inner_sql = original_sql.rstrip(";")
+    try:
+        return await preflight_service.explain_report(
+            inner_sql, limit, offset, session or count == "exact", request_class
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def submit_query_job(query: str, client_job_id: str | None, request_class: str = "batch"):
+    original_sql = query.strip()
+    _check_safe(original_sql)
+    inner_sql = original_sql.rstrip(";")
+    # A job materializes the whole result, so the pre-flight judges the full query.
+    if config.PREFLIGHT_ENABLED:
+        _, request_class = await _preflight(inner_sql, 0, 0, True, request_class)
+    job = job_service.submit_job(client_job_id, normalize_sql(inner_sql), inner_sql, request_class)
+    return job.describe()
+
+async def get_job_result(job_id: str, limit: int, offset: int, output: str = "json"):
+    job = job_service.get_job(job_id)
+    status = job.status
+    expired = HTTPException(status_code=410, detail=f"Result of job {job_id} has expired")
+    if status == "expired":
+        raise expired
+    if status != "succeeded":
+        detail = f"Job {job_id} is {status}"
+        raise HTTPException(status_code=409, detail=f"{detail}: {job.error}" if job.error else detail)
+    result_session = job_service.result_session(job)
+    if result_session is None:
+        raise expired
+    try:
+        return await _session_page(job_id, result_session, limit, offset, output)
+    except FileNotFoundError:
+        # Evicted or expired by the worker that ran the job while we read it.
+        raise expired
+
+# (normalized sql, limit, offset, count mode) -> JSON response
+_result_cache = ByteBudgetCache(config.QUERY_CACHE_MAX_BYTES, config.QUERY_CACHE_TTL)
+
+# Rows encoded to estimate a cached page's size.
+_SIZE_SAMPLE_ROWS = 16
+
+def _estimate_nbytes(response: dict) -> int:
+    # Sizes a cache entry from a few encoded rows scaled to the page, instead
+    # of encoding the whole page a second time just to measure it.
+    data = response["data"]
+    envelope = len(dumps_line({**response, "data": []}))
+    if not data:
+        return envelope
+    step = max(1, len(data) // _SIZE_SAMPLE_ROWS)
+    sample = data[::step][:_SIZE_SAMPLE_ROWS]
+    per_row = sum(len(dumps_line(r)) for r in sample) / len(sample)
+    return envelope + int(per_row * len(data))
+
+def result_cache_stats() -> dict:
+    return {"enabled": config.QUERY_CACHE_ENABLED, "default_ttl": _result_cache.default_ttl, **_result_cache.stats()}
+
+async def execute_query_logic(
+    query: str,
+    limit: int,
+    offset: int,
+    client_query_id: str | None,
+    count: str = "exact",
+    output: str = "json",
+    cache: str = "use",
+    cache_ttl: float | None = None,
+    session: bool = False,
+    request_class: str = "interactive",
+):
+    original_sql = query.strip()
+    query_id = client_query_id or str(uuid.uuid4())
+
+    # 1. Safety Check
+    _check_safe(original_sql)
     
     # 2. Wrap query
     inner_sql = original_sql.rstrip(";")
+
+    # 2.1 Result session: run once, serve every page from session storage
+    if session:
+        # Only the call that materializes the session runs the pre-flight.
+        if config.PREFLIGHT_ENABLED and not session_service.has_session(query_id):
+            _, request_class = await _preflight(inner_sql, limit, offset, True, request_class)
+        return await _execute_session_page(query_id, inner_sql, limit, offset, output, request_class)
+
+    # 2.2 Result cache (JSON responses only)
+    cache_key = None
+    if config.QUERY_CACHE_ENABLED and output == "json" and cache != "bypass":
+        cache_key = (normalize_sql(inner_sql), limit, offset, count)
+        if cache == "use":
+            cached = _result_cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "query_id": query_id, "cached": True}
     
+    # 2.3 Cost pre-flight: EXPLAIN only, before any slot or executor time is spent
+    estimate = None
+    if config.PREFLIGHT_ENABLED:
+        estimate, request_class = await _preflight(
+            inner_sql, limit, offset, count == "exact", request_class
+        )
+    # The plan already carries the estimate an "estimated" count would fetch.
+    precount = estimate.total_rows if estimate is not None and count == "estimated" else None
+
     wrapped_sql = text(f"""
         SELECT * FROM (
             {inner_sql}
@@ -28,78 +202,104 @@ async def execute_query_logic(query: str, limit: int, offset: int, client_query_
         LIMIT :limit OFFSET :offset
     """)
     
-    count_sql = text(f"""
-        SELECT COUNT(*) FROM (
-            {inner_sql}
-        ) AS count_query
-    """)
-    
-    try:
-        async with engine.connect() as conn:
-            # 2.5 Query Tracking
-            pid = await query_repository.get_backend_pid(conn)
-            cancel_service.register_pid(query_id, pid)
+    # 2.4 Admission control: bounded concurrency and queue per request class
+    async with admission_service.controller_for(request_class).admit() as limits:
+        try:
+            async with AsyncExitStack() as stack:
+                # The count runs concurrently on a second connection so the total
+                # costs max(count, data) instead of count + data. Both connections
+                # are taken under one lock so requests holding one connection can
+                # never all wait on each other for their second.
+                # Data and count share one server so the total matches the page.
+                count_conn = None
+                engine = read_engine("adhoc")
+                async with _checkout_lock:
+                    conn = await stack.enter_async_context(engine.connect())
+                    if count != "none" and precount is None:
+                        count_conn = await stack.enter_async_context(engine.connect())
+
+                # 2.5 Query Tracking: every backend working on this query_id is
+                # tagged so /query/cancel on any worker stops all of them.
+                tracked = [conn] if count_conn is None else [conn, count_conn]
+                await asyncio.gather(
+                    *(cancel_service.track_connection(c, query_id, limits) for c in tracked)
+                )
             
-            try:
-                # Execute count query
-                total_rows = await query_repository.execute_count_query(count_sql, {}) # params handled in execute/logic? No, params empty for count usually unless bound
-                # Wait, count_sql above wraps inner_sql which might have params? No, user query is raw string here.
-                # Actually, the original code executed count_sql on conn.
-                # Here we are using query_repository helper which opens NEW connection. This is WRONG if we want to track PID on the same connection?
-                # The requirement says "Before running the user SQL, execute SELECT pg_backend_pid()".
-                # If we use `query_repository.execute_count_query`, it opens a NEW connection.
-                # So we must execute on the SAME connection `conn` we just opened.
-                
-                # REFACTOR NOTE: The repository pattern suggests passing the connection if transaction/session logic is needed.
-                # Or we just do it here for now since `execute_query_logic` is the service layer orchestrating it.
+                count_task = None
+                try:
+                    if count_conn is not None:
+                        count_task = asyncio.create_task(metrics.timed(
+                            count_service.count_rows(count, inner_sql, {}, conn=count_conn),
+                            "query", "count_query",
+                        ))
                 
-                # Execute count (on same conn to be safe? actually count doesn't need same conn, but main query does for PID tracking)
-                # Actually PID is for the connection running the query.
-                # If we run count on one conn and data on another, distinct PIDs.
-                # We want to cancel the DATA query.
+                    # Without an exact total, has_more comes from fetching one extra row.
+                    fetch_limit = limit if count == "exact" else limit + 1
+                    with metrics.stage("query", "data_query"):
+                        result = await conn.execute(wrapped_sql, {"limit": fetch_limit, "offset": offset})
                 
-                # Let's run count first. 
-                # Note: `execute_count_query` in repo opens its own connection. 
-                # That's fine for count.
-                total_rows = await query_repository.execute_count_query(count_sql, {})
+                        # 3. Safe Fetch
+                        rows = result.fetchmany(fetch_limit)
+                    has_more = len(rows) > limit
+                    rows = rows[:limit]
+                    keys = list(result.keys())
+                    type_oids = [d[1] for d in result.cursor.description]
                 
-                # Now the data query.
-                # We need PID of the connection that runs data query.
-                # So we must get PID and run query on SAME connection.
+                    total_rows = await count_task if count_task else precount
                 
-                # Execute data query
-                result = await conn.execute(wrapped_sql, {"limit": limit, "offset": offset})
+                    row_count = len(rows)
+                    if count == "exact":
+                        has_more = (offset + row_count) < total_rows
+                    metrics.count_rows("query", row_count)
                 
-                # 3. Safe Fetch
-                rows = result.fetchmany(limit)
-                keys = list(result.keys())
+                    if output == "arrow":
+                        with metrics.stage("query", "arrow_encode"):
+                            body = encode_record_batch(
+                                names=keys,
+                                pg_types=[PG_OID_TYPES.get(oid, "text") for oid in type_oids],
+                                categories=["string"] * len(keys),
+                                rows=rows,
+                                metadata={"meta": {
+                                    "row_count": row_count,
+                                    "total_rows": total_rows,
+                                    "count_mode": count,
+                                    "has_more": has_more,
+                                    "query_id": query_id,
+                                }},
+                            )
+                        return Response(content=body, media_type=ARROW_MEDIA_TYPE)
                 
-                data = []
-                for r in rows:
-                    row_dict = {}
-                    mapping = r._mapping if hasattr(r, '_mapping') else r
-                    for k, v in mapping.items():
-                        row_dict[k] = str(v) if v is not None else None
-                    data.append(row_dict)
+                    with metrics.stage("query", "row_conversion"):
+                        convert_row = row_converter(tuple(keys), ("string",) * len(keys))
+                        data = [convert_row(r) for r in rows]
                 
-                row_count = len(data)
-                has_more = (offset + row_count) < total_rows
-                
-                return {
-                    "columns": [{"key": k, "label": k, "type": "string"} for k in keys],
-                    "data": data,
-                    "row_count": row_count,
-                    "total_rows": total_rows,
-                    "has_more": has_more,
-                    "query_id": query_id,
-                    "error": None
-                }
-            except SQLAlchemyError as e:
-                raise e
-            finally:
-                cancel_service.unregister_pid(query_id)
+                    response = {
+                        "columns": [{"key": k, "label": k, "type": "string"} for k in keys],
+                        "data": data,
+                        "row_count": row_count,
+                        "total_rows": total_rows,
+                        "count_mode": count,
+                        "has_more": has_more,
+                        "query_id": query_id,
+                        "cached": False,
+                        "error": None
+                    }
+                    if cache_key:
+                        _result_cache.set(cache_key, response, _estimate_nbytes(response), ttl=cache_ttl)
+                    return response
+                except SQLAlchemyError as e:
+                    raise e
+                finally:
+                    if count_task:
+                        if not count_task.done():
+                            count_task.cancel()
+                        # Also retrieves the count's exception if the data query failed first.
+                        await asyncio.gather(count_task, return_exceptions=True)
+                    cancel_service.unregister_pid(query_id)
             
-    except SQLAlchemyError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+from app.core import config
+from app.core.database import REPLICAS, Replica, catalog_engine
+from app.repositories import query_repository
+
+logger = logging.getLogger(__name__)
+
+
+async def _check(replica: Replica, primary_lsn: Optional[str], primary_at: float) -> None:
+    try:
+        in_recovery, caught_up, replay_age = await asyncio.wait_for(
+            query_repository.get_replication_status(replica.engines["catalog"], primary_lsn),
+            timeout=max(config.REPLICA_CHECK_INTERVAL, 1),
+        )
+    except Exception as e:
+        replica.healthy, replica.lag, replica.error = False, None, str(e) or type(e).__name__
+        replica.checked_at = time.time()
+        return
+
+    # Lag is how old the newest primary position the replica is known to have
+    # replayed is. It keeps growing while the replica stops following (WAL
+    # receiver down, primary unreachable) even though nothing is left to replay.
+    if caught_up:
+        replica.caught_up_at = primary_at
+    if replica.caught_up_at is not None:
+        lag = time.time() - replica.caught_up_at
+    else:
+        # Not yet seen caught up since startup: age of the last replayed commit.
+        lag = replay_age
+    replica.lag = lag
+    if not in_recovery:
+        # A promoted or misconfigured server no longer follows the primary.
+        replica.healthy, replica.error = False, "not in recovery"
+    elif lag is None:
+        replica.healthy, replica.error = False, "replay position unknown"
+    elif lag > config.REPLICA_MAX_LAG:
+        replica.healthy, replica.error = False, f"lag {lag:.1f}s over {config.REPLICA_MAX_LAG:g}s"
+    else:
+        replica.healthy, replica.error = True, None
+    replica.checked_at = time.time()
+
+
+async def check_replicas() -> None:
+    was_healthy = {r.name: r.healthy for r in REPLICAS}
+    # The primary's position is read first, so a replica that has replayed it
+    # is at most as stale as this moment.
+    primary_at = time.time()
+    try:
+        primary_lsn = await asyncio.wait_for(
+            query_repository.get_primary_wal_lsn(catalog_engine),
+            timeout=max(config.REPLICA_CHECK_INTERVAL, 1),
+        )
+    except Exception as e:
+        logger.warning("Primary WAL position unavailable for replica checks: %s", e)
+        primary_lsn = None
+    await asyncio.gather(*(_check(r, primary_lsn, primary_at) for r in REPLICAS))
+    for r in REPLICAS:
+        if r.healthy != was_healthy[r.name]:
+            if r.healthy:
+                logger.info("Replica %s back in rotation (lag %.2fs)", r.name, r.lag)
+            else:
+                logger.warning("Replica %s out of rotation: %s", r.name, r.error)
+
+
+async def monitor_replicas() -> None:
+    while True:
+        await check_replicas()
+        await asyncio.sleep(config.REPLICA_CHECK_INTERVAL)
+
+
+def replica_stats() -> dict[str, Any]:
+    return {
+        "max_lag": config.REPLICA_MAX_LAG,
+        "check_interval": config.REPLICA_CHECK_INTERVAL,
+        "routing": "replicas" if any(r.healthy for r in REPLICAS) else "primary",
+        "replicas": [
+            {
+                "name": r.name,
+                "healthy": r.healthy,
+                "lag_s": None if r.lag is None else round(r.lag, 3),
+                "checked_at": r.checked_at,
+                "error": r.error,
+                "served": dict(r.served),
+            }
+            for r in REPLICAS
+        ],
+    }
@@ -0,0 +1,404 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core import config
+from app.core.database import read_engine
+from app.services import admission_service, cancel_service
+
+logger = logging.getLogger(__name__)
+
+FETCH_BATCH_SIZE = 1000
+# Byte offset of every INDEX_STRIDE-th row is kept so a page read seeks close
+# to its first row instead of scanning the file from the start.
+INDEX_STRIDE = 1000
+
+
+@dataclass
+class ResultSession:
+    query_id: str
+    sql_key: str
+    path: Path
+    keys: list[str] = field(default_factory=list)
+    total_rows: int = 0
+    nbytes: int = 0
+    offsets: list[int] = field(default_factory=list)
+    # Wall clock, so it compares with the record's mtime that other workers touch.
+    last_access: float = field(default_factory=time.time)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    error: Optional[str] = None
+    idle_ttl: float = config.SESSION_IDLE_TTL
+
+
+SESSIONS: dict[str, ResultSession] = {}
+
+# Every session also has a record under SESSION_DIR/sessions naming the worker
+# that owns it, so any worker sharing SESSION_DIR serves its pages in place,
+# enforces its SQL binding and can close it.
+RECORD_POLL_INTERVAL = 0.2
+
+
+def _record_path(query_id: str) -> Path:
+    # Query ids come from clients; the file name is a digest of the id.
+    name = hashlib.sha256(query_id.encode("utf-8")).hexdigest()
+    return Path(config.SESSION_DIR) / "sessions" / f"{name}.json"
+
+
+def _sql_digest(sql_key: str) -> str:
+    return hashlib.sha256(sql_key.encode("utf-8")).hexdigest()
+
+
+def _record(session: ResultSession, status: str) -> dict[str, Any]:
+    return {
+        "query_id": session.query_id,
+        "owner": os.getpid(),
+        "status": status,
+        "sql": _sql_digest(session.sql_key),
+        "path": str(session.path),
+        "keys": session.keys,
+        "total_rows": session.total_rows,
+        "offsets": session.offsets,
+    }
+
+
+def _claim_record(session: ResultSession) -> bool:
+    # Created exclusively, so only one worker materializes a query id.
+    path = _record_path(session.query_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with path.open("x") as f:
+            f.write(json.dumps(_record(session, "running")))
+    except FileExistsError:
+        return False
+    return True
+
+
+def _write_record(session: ResultSession, status: str) -> None:
+    path = _record_path(session.query_id)
+    # Written aside and renamed, so readers never see a partial record.
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(_record(session, status)))
+    os.replace(tmp, path)
+
+
+def _read_record(query_id: str) -> Optional[dict[str, Any]]:
+    try:
+        return json.loads(_record_path(query_id).read_text())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # Claimed but not written yet.
+        return {"status": "running", "owner": None}
+
+
+def _record_access(session: ResultSession) -> float:
+    # Pages read through other workers touch the record.
+    try:
+        return max(session.last_access, _record_path(session.query_id).stat().st_mtime)
+    except FileNotFoundError:
+        return session.last_access
+
+
+class _DiskBudgetExceeded(Exception):
+    pass
+
+
+def _disk_used() -> int:
+    return sum(s.nbytes for s in SESSIONS.values())
+
+
+def _make_room(nbytes: int, keep: ResultSession) -> None:
+    # Evict least recently used finished sessions until `nbytes` more fit.
+    idle = sorted(
+        (s for s in SESSIONS.values() if s is not keep and s.ready.is_set()),
+        key=lambda s: s.last_access,
+    )
+    while _disk_used() + nbytes > config.SESSION_DISK_BUDGET:
+        if not idle:
+            raise _DiskBudgetExceeded
+        close_session(idle.pop(0).query_id)
+
+
+def close_session(query_id: str) -> bool:
+    session = SESSIONS.pop(query_id, None)
+    if session is not None:
+        session.path.unlink(missing_ok=True)
+        _record_path(query_id).unlink(missing_ok=True)
+        return True
+    # Another worker's session: the file and record go now, and the owner
+    # drops its copy on the next lookup (get_session).
+    record = _read_record(query_id)
+    if record is None or record.get("owner") is None:
+        return False
+    Path(record["path"]).unlink(missing_ok=True)
+    _record_path(query_id).unlink(missing_ok=True)
+    return True
+
+
+def get_session(query_id: str) -> Optional[ResultSession]:
+    # This worker's session, unless another worker has closed it.
+    session = SESSIONS.get(query_id)
+    if session is not None and session.ready.is_set() and not _record_path(query_id).exists():
+        SESSIONS.pop(query_id, None)
+        session.path.unlink(missing_ok=True)
+        return None
+    return session
+
+
+def _drop_closed_sessions() -> None:
+    for query_id in list(SESSIONS):
+        get_session(query_id)
+
+
+def has_session(query_id: str) -> bool:
+    return get_session(query_id) is not None or _read_record(query_id) is not None
+
+
+def expire_idle_sessions() -> int:
+    _drop_closed_sessions()
+    now = time.time()
+    expired = [
+        qid for qid, s in SESSIONS.items()
+        if s.ready.is_set() and _record_access(s) < now - s.idle_ttl
+    ]
+    for qid in expired:
+        close_session(qid)
+    return len(expired) + _expire_orphaned_records()
+
+
+def _expire_orphaned_records() -> int:
+    # Records of workers that exited; their files went with the process dir.
+    removed = 0
+    for path in (Path(config.SESSION_DIR) / "sessions").glob("*.json"):
+        try:
+            record = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            continue
+        if not _pid_alive(record["owner"]):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+async def reap_idle_sessions() -> None:
+    while True:
+        await asyncio.sleep(max(config.SESSION_IDLE_TTL / 10, 1))
+        expire_idle_sessions()
+
+
+# Each worker process keeps its files in SESSION_DIR/<pid>-<token>, so workers
+# sharing SESSION_DIR never remove each other's live sessions.
+_PROCESS_DIR_RE = re.compile(r"^(\d+)-[0-9a-f]+$")
+_process_dir: Optional[Path] = None
+
+
+def process_dir() -> Path:
+    # Resolved per pid, so a worker forked from a preloaded parent gets its own.
+    global _process_dir
+    if _process_dir is None or not _process_dir.name.startswith(f"{os.getpid()}-"):
+        _process_dir = Path(config.SESSION_DIR) / f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        _process_dir.mkdir(parents=True, exist_ok=True)
+    return _process_dir
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def init_session_dir() -> None:
+    # Directories of processes that are gone (crashed or killed) are
+    # unreachable; those of live workers are left alone.
+    root = Path(config.SESSION_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    for entry in root.iterdir():
+        m = _PROCESS_DIR_RE.match(entry.name)
+        if m and entry.is_dir() and not _pid_alive(int(m.group(1))):
+            shutil.rmtree(entry, ignore_errors=True)
+    process_dir()
+
+
+def clear_session_dir() -> None:
+    # On shutdown: only this process's own files.
+    global _process_dir
+    for query_id in list(SESSIONS):
+        _record_path(query_id).unlink(missing_ok=True)
+    if _process_dir is not None:
+        shutil.rmtree(_process_dir, ignore_errors=True)
+        _process_dir = None
+
+
+async def _materialize(session: ResultSession, inner_sql: str, limits: dict[str, str]) -> None:
+    sql = text(f"""
+        SELECT * FROM (
+            {inner_sql}
+        ) AS session_query
+    """)
+    session.path.parent.mkdir(parents=True, exist_ok=True)
+    with session.path.open("wb") as f:
+        async with read_engine("adhoc").connect() as conn:
+            await cancel_service.track_connection(conn, session.query_id, limits)
+            try:
+                result = await conn.stream(sql.execution_options(yield_per=FETCH_BATCH_SIZE))
+                session.keys = list(result.keys())
+                async for partition in result.partitions():
+                    lines = []
+                    pos = session.nbytes
+                    for r in partition:
+                        if session.total_rows % INDEX_STRIDE == 0:
+                            session.offsets.append(pos)
+                        line = json.dumps([str(v) if v is not None else None for v in r]) + "\n"
+                        lines.append(line.encode("utf-8"))
+                        pos += len(lines[-1])
+                        session.total_rows += 1
+                    chunk = b"".join(lines)
+                    _make_room(len(chunk), session)
+                    await asyncio.to_thread(f.write, chunk)
+                    session.nbytes += len(chunk)
+            finally:
+                cancel_service.unregister_pid(session.query_id)
+
+
+async def open_session(
+    query_id: str,
+    sql_key: str,
+    inner_sql: str,
+    request_class: str = "interactive",
+    idle_ttl: Optional[float] = None,
+    on_start: Optional[Callable[[], None]] = None,
+) -> ResultSession:
+    session = get_session(query_id)
+    if session is not None:
+        if session.sql_key != sql_key:
+            raise HTTPException(
+                status_code=409, detail=f"Query ID {query_id} is bound to a different query"
+            )
+        await session.ready.wait()
+        if session.error:
+            raise HTTPException(status_code=400, detail=session.error)
+        session.last_access = time.time()
+        return session
+
+    session = ResultSession(
+        query_id=query_id,
+        sql_key=sql_key,
+        path=process_dir() / f"{uuid.uuid4().hex}.jsonl",
+        idle_ttl=config.SESSION_IDLE_TTL if idle_ttl is None else idle_ttl,
+    )
+    while not _claim_record(session):
+        remote = await _remote_session(query_id, sql_key)
+        if remote is not None:
+            return remote
+        if SESSIONS.get(query_id) is not None:
+            # Opened by a concurrent request on this worker meanwhile.
+            return await open_session(query_id, sql_key, inner_sql, request_class, idle_ttl, on_start)
+    SESSIONS[query_id] = session
+    try:
+        async with admission_service.controller_for(request_class).admit() as limits:
+            if on_start is not None:
+                on_start()
+            await _materialize(session, inner_sql, limits)
+    except _DiskBudgetExceeded:
+        session.error = "Result is too large for session storage"
+        close_session(query_id)
+        raise HTTPException(status_code=413, detail=session.error)
+    except BaseException as e:
+        session.error = str(e) or "Session query failed"
+        close_session(query_id)
+        raise
+    finally:
+        session.ready.set()
+    if not _record_path(query_id).exists():
+        # Closed through another worker while it was being materialized.
+        close_session(query_id)
+        raise HTTPException(status_code=410, detail=f"Session {query_id} was closed")
+    _write_record(session, "ready")
+    session.last_access = time.time()
+    return session
+
+
+async def _remote_session(query_id: str, sql_key: str) -> Optional[ResultSession]:
+    # Another worker holds the record: wait while it materializes, then read
+    # its file in place. None once the record is gone (closed, failed, or its
+    # worker exited), so the caller may claim the id itself.
+    while True:
+        record = _read_record(query_id)
+        if record is None:
+            return None
+        owner = record["owner"]
+        if owner is not None and not _pid_alive(owner):
+            _record_path(query_id).unlink(missing_ok=True)
+            return None
+        if owner is not None and record["sql"] != _sql_digest(sql_key):
+            raise HTTPException(
+                status_code=409, detail=f"Query ID {query_id} is bound to a different query"
+            )
+        if record["status"] == "ready":
+            break
+        await asyncio.sleep(RECORD_POLL_INTERVAL)
+    session = ResultSession(
+        query_id=query_id,
+        sql_key=sql_key,
+        path=Path(record["path"]),
+        keys=record["keys"],
+        total_rows=record["total_rows"],
+        offsets=record["offsets"],
+    )
+    session.ready.set()
+    return session
+
+
+def _read_rows(session: ResultSession, limit: int, offset: int) -> list[list[Any]]:
+    if offset >= session.total_rows:
+        return []
+    block = offset // INDEX_STRIDE
+    to_skip = offset - block * INDEX_STRIDE
+    rows = []
+    with session.path.open("rb") as f:
+        f.seek(session.offsets[block])
+        for _ in range(to_skip):
+            f.readline()
+        for _ in range(limit):
+            line = f.readline()
+            if not line:
+                break
+            rows.append(json.loads(line))
+    return rows
+
+
+async def read_page(session: ResultSession, limit: int, offset: int) -> list[list[Any]]:
+    session.last_access = time.time()
+    if session.query_id not in SESSIONS:
+        # Tells the owning worker the session is still in use.
+        try:
+            os.utime(_record_path(session.query_id))
+        except FileNotFoundError:
+            pass
+    return await asyncio.to_thread(_read_rows, session, limit, offset)
+
+
+def session_stats() -> dict[str, Any]:
+    _drop_closed_sessions()
+    return {
+        "sessions": len(SESSIONS),
+        "disk_used": _disk_used(),
+        "disk_budget": config.SESSION_DISK_BUDGET,
+        "dir": str(process_dir()),
+        "idle_ttl": config.SESSION_IDLE_TTL,
+    }
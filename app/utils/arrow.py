@@ -0,0 +1,106 @@
+import json
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency, only needed for Arrow responses
+    pa = None
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Builtin type OIDs as reported in cursor.description, mapped to udt names.
+PG_OID_TYPES = {
+    16: "bool",
+    20: "int8",
+    21: "int2",
+    23: "int4",
+    700: "float4",
+    701: "float8",
+    1700: "numeric",
+    1082: "date",
+    1114: "timestamp",
+    1184: "timestamptz",
+}
+
+
+def wants_arrow(accept: Optional[str]) -> bool:
+    return bool(accept) and ARROW_MEDIA_TYPE in accept
+
+
+def _arrow_type(pg_type: str, category: str):
+    by_pg_type = {
+        "int2": pa.int16(),
+        "int4": pa.int32(),
+        "int8": pa.int64(),
+        "float4": pa.float32(),
+        "float8": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us"),
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+    }
+    if pg_type in by_pg_type:
+        return by_pg_type[pg_type]
+    if pg_type == "numeric":
+        # Inferred from the Decimal values: a decimal128/256 wide enough for
+        # every value on the page, so nothing is rounded through float64.
+        return None
+    by_category = {
+        "number": pa.float64(),
+        "boolean": pa.bool_(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us"),
+    }
+    return by_category.get(category, pa.string())
+
+
+def _value_converter(arrow_type) -> Optional[Callable[[Any], Any]]:
+    if arrow_type is None:
+        return None
+    if pa.types.is_floating(arrow_type):
+        return float
+    if pa.types.is_string(arrow_type):
+        return str
+    return None
+
+
+def encode_record_batch(
+    names: list[str],
+    pg_types: list[str],
+    categories: list[str],
+    rows: list[Any],
+    metadata: dict[str, Any],
+) -> bytes:
+    if pa is None:
+        raise HTTPException(status_code=406, detail="Arrow responses require pyarrow on the server")
+
+    arrays = []
+    fields = []
+    for i, (name, pg_type, category) in enumerate(zip(names, pg_types, categories)):
+        arrow_type = _arrow_type(pg_type, category)
+        convert = _value_converter(arrow_type)
+        if convert is None:
+            values = [r[i] for r in rows]
+        else:
+            values = [None if r[i] is None else convert(r[i]) for r in rows]
+        try:
+            array = pa.array(values, type=arrow_type)
+            if arrow_type is None and pa.types.is_null(array.type):
+                # An all-NULL page still gets a decimal column.
+                array = pa.array(values, type=pa.decimal128(38, 0))
+            arrays.append(array)
+            arrow_type = array.type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+            # e.g. 'infinity' dates or NaN/out-of-range numerics: ship as text
+            arrow_type = pa.string()
+            arrays.append(pa.array([None if v is None else str(v) for v in (r[i] for r in rows)], type=arrow_type))
+        fields.append(pa.field(name, arrow_type))
+
+    schema = pa.schema(fields, metadata={k: json.dumps(v, default=str) for k, v in metadata.items()})
+    batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
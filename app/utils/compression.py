@@ -0,0 +1,176 @@
+import asyncio
+import time
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core import config, metrics
+
+try:
+    import brotli
+except ImportError:  # optional dependency, only needed for Content-Encoding: br
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for Content-Encoding: zstd
+    zstandard = None
+
+# Media types worth compressing; anything else (and anything already encoded)
+# passes through untouched.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.apache.arrow.stream",
+    "text/",
+)
+
+_AVAILABLE = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+ENCODINGS = tuple(e for e in config.COMPRESSION_ENCODINGS if _AVAILABLE.get(e))
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    # Highest q-value wins; ties go to the earlier entry in ENCODINGS.
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class Encoder:
+    # One incremental compressor per response. Every chunk is flushed, so a
+    # streamed export still reaches the client as it is produced.
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.raw = 0
+        self.compressed = 0
+        self.cpu_seconds = 0.0
+        if encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=config.COMPRESSION_ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._br = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        # thread_time: CPU of the calling thread, whether loop or worker.
+        start = time.thread_time()
+        if self.encoding == "zstd":
+            flush = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            out = self._zstd.compress(data) + self._zstd.flush(flush)
+        elif self.encoding == "br":
+            out = self._br.process(data) + (self._br.finish() if final else self._br.flush())
+        else:
+            out = self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.cpu_seconds += time.thread_time() - start
+        self.raw += len(data)
+        self.compressed += len(out)
+        return out
+
+    async def run(self, data: bytes, final: bool) -> bytes:
+        # Large chunks would stall every other request for milliseconds;
+        # zlib, brotli and zstandard release the GIL while compressing.
+        if len(data) >= config.COMPRESSION_THREAD_THRESHOLD:
+            return await asyncio.to_thread(self.encode, data, final)
+        return self.encode(data, final)
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    if status < 200 or status in (204, 304) or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    # Plain ASGI middleware, like MetricsMiddleware: streaming responses are
+    # compressed chunk by chunk instead of being collected first.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        buffered = b""
+        encoder: Optional[Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, buffered, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message["headers"]))
+                if not _compressible(message["status"], headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                message["headers"] = headers.raw
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Held back until we know whether the body is big enough.
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                buffered += body
+                if more_body and len(buffered) < config.COMPRESSION_MIN_SIZE:
+                    return
+                if len(buffered) < config.COMPRESSION_MIN_SIZE:
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": buffered})
+                    return
+
+                encoder = Encoder(encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                # The encoded bytes differ, so a strong validator becomes weak.
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                body = await encoder.run(buffered, final=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                start_message["headers"] = headers.raw
+                await send(start_message)
+            else:
+                body = await encoder.run(body, final=not more_body)
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+            if not more_body:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                metrics.observe_compression(
+                    route, encoding, encoder.raw, encoder.compressed, encoder.cpu_seconds
+                )
+
+        await self.app(scope, receive, send_wrapper)
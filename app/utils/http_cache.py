@@ -0,0 +1,19 @@
+import hashlib
+from typing import Optional
+from fastapi import Response
+
+def weak_etag(version) -> str:
+    # From a version/validator instead of the body: cheap to compute before
+    # any data is read. Weak, since it vouches for content, not bytes.
+    return 'W/"' + hashlib.blake2b(repr(version).encode(), digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {t.strip() for t in if_none_match.split(",")}
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    weak = {c[2:] if c.startswith("W/") else c for c in candidates}
+    return "*" in candidates or (etag[2:] if etag.startswith("W/") else etag) in weak
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
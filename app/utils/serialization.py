@@ -0,0 +1,86 @@
+import json
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency; falls back to the stdlib encoder
+    orjson = None
+
+
+def _decimal(v: Decimal) -> Any:
+    # Same rule as FastAPI's jsonable_encoder: integral decimals become ints.
+    return int(v) if v.as_tuple().exponent >= 0 else float(v)
+
+
+def _isoformat(v: Any) -> str:
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+
+def _text(v: Any) -> str:
+    return v if type(v) is str else str(v)
+
+
+# Converter per column category, mirroring metadata_service._cast_value.
+# None means the value is passed through; Decimals are handled by the encoder.
+_CONVERTERS: dict[str, Optional[Callable[[Any], Any]]] = {
+    "number": None,
+    "boolean": bool,
+    "date": _isoformat,
+    "datetime": _isoformat,
+    "string": _text,
+}
+
+# Postgres types whose driver values need no conversion at all.
+_PASSTHROUGH_PG_TYPES = {"int2", "int4", "int8", "float4", "float8", "bool"}
+
+
+@lru_cache(maxsize=1024)
+def row_converter(
+    keys: tuple[str, ...],
+    categories: tuple[str, ...],
+    pg_types: Optional[tuple[str, ...]] = None,
+) -> Callable[[Sequence[Any]], dict[str, Any]]:
+    # Built once per result shape; rows are converted positionally.
+    convs = []
+    for i, category in enumerate(categories):
+        if pg_types and pg_types[i] in _PASSTHROUGH_PG_TYPES:
+            convs.append(None)
+        else:
+            convs.append(_CONVERTERS.get(category, _text))
+
+    if all(c is None for c in convs):
+        return lambda row: dict(zip(keys, row))
+
+    pairs = tuple(zip(keys, convs))
+
+    def convert(row: Sequence[Any]) -> dict[str, Any]:
+        return {
+            k: v if v is None or c is None else c(v)
+            for (k, c), v in zip(pairs, row)
+        }
+
+    return convert
+
+
+def _default(v: Any) -> Any:
+    if isinstance(v, Decimal):
+        return _decimal(v)
+    return str(v)
+
+
+class FastJSONResponse(JSONResponse):
+    # Writes bytes directly, skipping jsonable_encoder when returned from a route.
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_line(content: Any) -> bytes:
+    # One NDJSON record.
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(content, default=_default) + "\n").encode("utf-8")
@@ -0,0 +1,103 @@
+import re
+
+# A dollar-quote opener: $$ or $tag$ (tags cannot start with a digit, so $1 is a parameter).
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+
+
+def normalize_sql(sql: str) -> str:
+    # Whitespace/comment-insensitive form of a statement, for use as a cache key.
+    # One left-to-right pass, so a quote inside a comment or a backslash escape
+    # never shifts where a literal starts; literals and identifiers stay byte-exact.
+    parts: list[str] = []
+    space = False
+    i, n = 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if c.isspace():
+            space = True
+            i += 1
+            continue
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            space = True
+            continue
+        if sql.startswith("/*", i):
+            i = _skip_block_comment(sql, i)
+            space = True
+            continue
+
+        if c == "'":
+            start = i
+            escapes = i > 0 and sql[i - 1] in "eE" and not _ident_char(sql, i - 2)
+            i = _skip_string(sql, i, escapes)
+        elif c == '"':
+            start = i
+            i = _skip_quoted(sql, i, '"')
+        elif c == "$" and not _ident_char(sql, i - 1) and (m := _DOLLAR_TAG.match(sql, i)):
+            start = i
+            end = sql.find(m.group(0), m.end())
+            i = n if end == -1 else end + len(m.group(0))
+        else:
+            start = i
+            i += 1
+            while i < n and not sql[i].isspace() and sql[i] not in "'\"$-/":
+                i += 1
+        if space and parts:
+            parts.append(" ")
+        space = False
+        parts.append(sql[start:i])
+    return "".join(parts).rstrip(";").strip()
+
+
+def _ident_char(sql: str, i: int) -> bool:
+    return i >= 0 and (sql[i].isalnum() or sql[i] in "_$")
+
+
+def _skip_string(sql: str, i: int, escapes: bool) -> int:
+    # Standard strings double a quote (''); E'' strings also allow \'.
+    n = len(sql)
+    i += 1
+    while i < n:
+        c = sql[i]
+        if escapes and c == "\\":
+            i += 2
+            continue
+        if c == "'":
+            if i + 1 < n and sql[i + 1] == "'":
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_quoted(sql: str, i: int, quote: str) -> int:
+    n = len(sql)
+    i += 1
+    while i < n:
+        if sql[i] == quote:
+            if i + 1 < n and sql[i + 1] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_block_comment(sql: str, i: int) -> int:
+    # PostgreSQL block comments nest.
+    depth = 0
+    n = len(sql)
+    while i < n:
+        if sql.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif sql.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return n
@@ -0,0 +1,93 @@
+# Micro-benchmark: per-request cost of the Prometheus instrumentation.
+# Run from the repository root:
+#
+#     python -m benchmarks.bench_metrics [--requests 20000] [--stages 8]
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.core import metrics
+from app.services import metrics_service
+
+
+def bench_stage(n: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    bare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with metrics.stage("table", "data_query", "other"):
+            pass
+    timed = time.perf_counter() - start
+    return bare / n, timed / n
+
+
+async def bench_middleware(n: int, stages: int) -> tuple[float, float]:
+    route = SimpleNamespace(path="/table")
+    body = b"{}" * 512
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = route
+        # Roughly what one /table request records besides the middleware.
+        for _ in range(stages):
+            with metrics.stage("table", "data_query", "other"):
+                pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    async def plain(scope, receive, send):
+        scope["route"] = route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    def scope():
+        return {"type": "http", "path": "/table", "method": "GET"}
+
+    async def run(app) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(scope(), receive, send)
+        return (time.perf_counter() - start) / n
+
+    return await run(plain), await run(metrics.MetricsMiddleware(endpoint))
+
+
+def bench_render(repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body, _ = metrics_service.render()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--stages", type=int, default=8)
+    args = parser.parse_args()
+
+    bare, timed = bench_stage(args.requests)
+    print(f"stage timer: {(timed - bare) * 1e6:.2f} us per observation")
+
+    plain, instrumented = asyncio.run(bench_middleware(args.requests, args.stages))
+    print(
+        f"request with middleware + {args.stages} stages: "
+        f"{(instrumented - plain) * 1e6:.2f} us overhead per request"
+    )
+
+    render, size = bench_render(20)
+    print(f"/metrics render: {render * 1000:.2f} ms ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
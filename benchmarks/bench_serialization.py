@@ -0,0 +1,89 @@
+# Micro-benchmark: /table row conversion + JSON encoding, old path vs new.
+# Run from the repository root:
+#
+#     python -m benchmarks.bench_serialization [--rows 5000] [--cols 40] [--repeat 5]
+import argparse
+import json
+import datetime as dt
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.metadata_service import _cast_value
+from app.utils.serialization import FastJSONResponse, row_converter
+
+# (category, pg type, value factory)
+COLUMN_KINDS = [
+    ("number", "int4", lambda i: i),
+    ("number", "numeric", lambda i: Decimal(i) / 100),
+    ("number", "float8", lambda i: i * 0.5),
+    ("boolean", "bool", lambda i: i % 2 == 0),
+    ("date", "date", lambda i: dt.date(2024, 1, 1) + dt.timedelta(days=i % 365)),
+    ("datetime", "timestamp", lambda i: dt.datetime(2024, 1, 1) + dt.timedelta(seconds=i)),
+    ("string", "text", lambda i: f"value-{i}"),
+    ("string", "text", lambda i: None if i % 7 == 0 else f"note {i}"),
+]
+
+
+def make_result(n_rows: int, n_cols: int):
+    kinds = [COLUMN_KINDS[c % len(COLUMN_KINDS)] for c in range(n_cols)]
+    keys = tuple(f"col_{c}" for c in range(n_cols))
+    rng = random.Random(42)
+    rows = [tuple(k[2](rng.randrange(1_000_000)) for k in kinds) for _ in range(n_rows)]
+    col_map = {key: {"key": key, "type": k[0]} for key, k in zip(keys, kinds)}
+    pg_types = tuple(k[1] for k in kinds)
+    return keys, rows, col_map, pg_types
+
+
+def old_path(keys, rows, col_map) -> bytes:
+    # get_table_details before the serialization layer, then FastAPI's default encoding.
+    data = []
+    for r in rows:
+        row = {}
+        for k, v in zip(keys, r):
+            row[k] = _cast_value(v, col_map[k]["type"])
+        data.append(row)
+    return JSONResponse(jsonable_encoder({"data": data})).body
+
+
+def new_path(keys, rows, col_map, pg_types) -> bytes:
+    convert_row = row_converter(keys, tuple(col_map[k]["type"] for k in keys), pg_types)
+    data = [convert_row(r) for r in rows]
+    return FastJSONResponse({"data": data}).body
+
+
+def bench(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--cols", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    keys, rows, col_map, pg_types = make_result(args.rows, args.cols)
+
+    assert json.loads(old_path(keys, rows, col_map)) == json.loads(new_path(keys, rows, col_map, pg_types))
+
+    old = bench(lambda: old_path(keys, rows, col_map), args.repeat)
+    new = bench(lambda: new_path(keys, rows, col_map, pg_types), args.repeat)
+
+    print(f"{args.rows} rows x {args.cols} cols, best of {args.repeat}")
+    print(f"  old (_cast_value + jsonable_encoder): {min(old) * 1000:8.1f} ms  (median {statistics.median(old) * 1000:.1f})")
+    print(f"  new (row_converter + FastJSONResponse): {min(new) * 1000:6.1f} ms  (median {statistics.median(new) * 1000:.1f})")
+    print(f"  speedup: {min(old) / min(new):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Compares two benchmarks.loadtest JSON reports, e.g. before and after a commit:
+#
+#     python -m benchmarks.compare old.json new.json [--threshold 10]
+#
+# Exits with status 1 if any scenario's p50/p95/p99 grew, or its throughput
+# fell, by more than --threshold percent.
+import argparse
+import json
+import sys
+
+LATENCY_FIELDS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _key(result: dict) -> tuple:
+    return result["scenario"], result["table"]
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    old_results = {_key(r): r for r in old["results"]}
+
+    print(f"old: {old['meta'].get('commit')} {old['meta']['timestamp']}")
+    print(f"new: {new['meta'].get('commit')} {new['meta']['timestamp']}\n")
+    print(f"{'scenario':<44} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8}")
+
+    regressions = 0
+    for r in new["results"]:
+        base = old_results.get(_key(r))
+        if base is None:
+            continue
+        changes = [_change(base[f], r[f]) for f in LATENCY_FIELDS]
+        throughput = _change(base["throughput_rps"], r["throughput_rps"])
+        regressed = any(c > args.threshold for c in changes) or throughput < -args.threshold
+        regressions += regressed
+        label = r["scenario"] + (f"[{r['table']}]" if r["table"] else "")
+        cols = " ".join(f"{c:>+7.1f}%" for c in (*changes, throughput))
+        print(f"{label:<44} {cols}{'  REGRESSION' if regressed else ''}")
+
+    print(f"\n{regressions} regression(s) over {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
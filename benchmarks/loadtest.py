@@ -0,0 +1,293 @@
+# Load test for /table, /query and /metadata against seeded synthetic tables.
+# Seed first (python -m benchmarks.seed), start the server, then from the
+# repository root:
+#
+#     python -m benchmarks.loadtest [--base-url http://localhost:8000] [--sizes 10k,100k,1m]
+#         [--concurrency 8] [--requests 200] [--scenarios table_,query_] [--out results.json]
+#
+# --in-process drives the app through httpx's ASGI transport instead of a live
+# server (no uvicorn/network in the numbers). Results are written as JSON; use
+# python -m benchmarks.compare old.json new.json to diff two runs.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.seed import parse_size, table_name
+
+# Stages from /metrics that are spent waiting on Postgres.
+DB_STAGES = {"catalog_lookup", "count_query", "data_query", "preflight"}
+
+# (rng, schema, table, rows) -> (method, path, httpx request kwargs)
+RequestBuilder = Callable[[random.Random, str, str, int], tuple[str, str, dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: RequestBuilder
+    per_table: bool = True
+
+
+def _table(params: Callable[[random.Random, int], dict[str, Any]]) -> RequestBuilder:
+    def build(rng, schema, table, rows):
+        return "GET", "/table", {"params": {"schema": schema, "table": table, **params(rng, rows)}}
+    return build
+
+
+def _query(sql: str, body: Callable[[random.Random, int], dict[str, Any]]) -> RequestBuilder:
+    def build(rng, schema, table, rows):
+        return "POST", "/query", {"json": {
+            "query": sql.format(rel=f'"{schema}"."{table}"'),
+            "cache": "bypass",
+            **body(rng, rows),
+        }}
+    return build
+
+
+SCENARIOS = [
+    Scenario("table_first_page", _table(lambda rng, rows: {"limit": 50})),
+    Scenario("table_deep_offset", _table(lambda rng, rows: {
+        "limit": 50,
+        "offset": rng.randrange(int(rows * 0.9), max(rows - 50, int(rows * 0.9) + 1)),
+    })),
+    Scenario("table_sort", _table(lambda rng, rows: {
+        "limit": 50, "offset": rng.randrange(0, 1000), "sort_by": "amount", "sort_dir": "desc",
+    })),
+    Scenario("table_filter", _table(lambda rng, rows: {
+        "limit": 50,
+        "sort_by": "created_at",
+        "filters": json.dumps([
+            {"field": "customer", "op": "contains", "value": f"_{rng.randrange(10, 99)}"},
+            {"field": "amount", "op": "gte", "value": rng.randrange(0, 900)},
+        ]),
+    })),
+    Scenario("table_cursor", _table(lambda rng, rows: {
+        "limit": 50, "pagination": "cursor", "sort_by": "created_at", "count": "none",
+    })),
+    Scenario("table_sample", _table(lambda rng, rows: {
+        "limit": 50, "sample": "system", "count": "estimated",
+    })),
+    Scenario("query_page", _query(
+        "SELECT id, customer, amount, created_at FROM {rel} WHERE category = 'books'",
+        lambda rng, rows: {"limit": 50, "offset": rng.randrange(0, 1000)},
+    )),
+    Scenario("query_aggregate", _query(
+        "SELECT category, count(*), avg(amount) FROM {rel} GROUP BY category",
+        lambda rng, rows: {"limit": 50, "count": "none"},
+    )),
+    Scenario("metadata_columns", lambda rng, schema, table, rows: (
+        "GET", f"/metadata/schemas/{schema}/columns", {"params": {"table": table}},
+    )),
+    Scenario("metadata_overview", lambda rng, schema, table, rows: (
+        "GET", f"/metadata/schemas/{schema}/overview", {},
+    ), per_table=False),
+    Scenario("metadata_tables", lambda rng, schema, table, rows: (
+        "GET", f"/metadata/schemas/{schema}/tables", {},
+    ), per_table=False),
+]
+
+
+async def _scrape_db_time(client: httpx.AsyncClient) -> Optional[dict[str, float]]:
+    # Cumulative seconds spent in DB stages and pool checkouts, from /metrics.
+    try:
+        res = await client.get("/metrics")
+        res.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    totals = {"db": 0.0, "pool_wait": 0.0}
+    for family in text_string_to_metric_families(res.text):
+        for sample in family.samples:
+            if sample.name == "app_stage_duration_seconds_sum" and sample.labels.get("stage") in DB_STAGES:
+                totals["db"] += sample.value
+            elif sample.name == "db_pool_acquire_seconds_sum":
+                totals["pool_wait"] += sample.value
+    return totals
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) < 2:
+        value = round(latencies[0] * 1000, 3) if latencies else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    schema: str,
+    table: str,
+    rows: int,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict[str, Any]:
+    rng = random.Random(f"{seed}:{scenario.name}:{table}")
+
+    for _ in range(warmup):
+        method, path, kwargs = scenario.build(rng, schema, table, rows)
+        await client.request(method, path, **kwargs)
+
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, path, kwargs = scenario.build(rng, schema, table, rows)
+            start = time.perf_counter()
+            try:
+                res = await client.request(method, path, **kwargs)
+                await res.aread()
+                status = str(res.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    before = await _scrape_db_time(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await _scrape_db_time(client)
+
+    done = len(latencies)
+    result = {
+        "scenario": scenario.name,
+        "table": f"{schema}.{table}" if scenario.per_table else None,
+        "rows": rows if scenario.per_table else None,
+        "requests": done,
+        "errors": sum(n for s, n in statuses.items() if not s.startswith("2")),
+        "statuses": statuses,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(done / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        **_percentiles(latencies),
+        "max_ms": round(max(latencies) * 1000, 3) if latencies else 0.0,
+        "db_ms_per_request": None,
+        "pool_wait_ms_per_request": None,
+    }
+    if before is not None and after is not None and done:
+        result["db_ms_per_request"] = round((after["db"] - before["db"]) / done * 1000, 3)
+        result["pool_wait_ms_per_request"] = round(
+            (after["pool_wait"] - before["pool_wait"]) / done * 1000, 3
+        )
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_result(r: dict[str, Any]) -> None:
+    label = r["scenario"] + (f"[{r['table']}]" if r["table"] else "")
+    db = "-" if r["db_ms_per_request"] is None else f"{r['db_ms_per_request']:.1f}"
+    print(
+        f"{label:<44} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>9.1f} "
+        f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {db:>9}"
+    )
+
+
+async def run(args) -> dict[str, Any]:
+    wanted = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    scenarios = [s for s in SCENARIOS if not wanted or any(s.name.startswith(w) for w in wanted)]
+    tables = [(table_name(size), parse_size(size)) for size in args.sizes.split(",")]
+
+    if args.in_process:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        transport = None
+        base_url = args.base_url
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+    print(
+        f"{'scenario':<44} {'reqs':>6} {'errs':>5} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'db ms':>9}"
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, transport=transport, limits=limits, timeout=args.timeout
+    ) as client:
+        for scenario in scenarios:
+            targets = tables if scenario.per_table else tables[:1]
+            for table, rows in targets:
+                result = await run_scenario(
+                    client, scenario, args.schema, table, rows,
+                    args.requests, args.concurrency, args.warmup, args.seed,
+                )
+                _print_result(result)
+                results.append(result)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "target": "in-process" if args.in_process else args.base_url,
+            "schema": args.schema,
+            "sizes": args.sizes.split(","),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--schema", default="bench")
+    parser.add_argument("--sizes", default="10k,100k,1m")
+    parser.add_argument("--scenarios", default="", help="comma-separated name prefixes")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario and table")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    out = args.out
+    if out is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        out = os.path.join("benchmarks", "results", f"{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
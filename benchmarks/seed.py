@@ -0,0 +1,98 @@
+# Seeds deterministic synthetic tables for the load test.
+# Run from the repository root (uses DATABASE_URL like the app):
+#
+#     python -m benchmarks.seed [--sizes 10k,100k,1m,10m] [--schema bench] [--force]
+#
+# Each size becomes "<schema>.items_<size>". Values are derived from the row
+# number only, so every seed of a given size holds exactly the same data.
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import config
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+# Mixed types: ints, numeric, float, bool, text (high and low cardinality),
+# nullable text, date, timestamptz, uuid and jsonb.
+ITEMS_SELECT = """
+    SELECT
+        i AS id,
+        'customer_' || (i * 7919 % 50000) AS customer,
+        (ARRAY['books', 'games', 'garden', 'music', 'office', 'sports', 'tools', 'toys'])[1 + (i % 8)::int] AS category,
+        round(((i * 104729 % 100000) / 100.0)::numeric, 2) AS amount,
+        (i * 31 % 500)::int AS quantity,
+        ((i * 2654435761 % 1000000) / 1000000.0)::float8 AS score,
+        (i % 3 = 0) AS active,
+        timestamptz '2020-01-01 00:00:00+00' + (i * 3779 % 157766400) * interval '1 second' AS created_at,
+        date '2020-01-01' + (i * 13 % 1826)::int AS shipped_on,
+        CASE WHEN i % 5 = 0 THEN NULL ELSE 'note ' || md5(i::text) END AS note,
+        md5('id' || i)::uuid AS ref,
+        jsonb_build_object('v', i % 100, 'tag', 't' || i % 10) AS attrs
+    FROM generate_series(1, CAST(:rows AS bigint)) AS i
+"""
+
+
+def parse_size(raw: str) -> int:
+    raw = raw.strip().lower()
+    if raw[-1] in SIZE_SUFFIXES:
+        return int(float(raw[:-1]) * SIZE_SUFFIXES[raw[-1]])
+    return int(raw)
+
+
+def table_name(size: str) -> str:
+    return f"items_{size.strip().lower()}"
+
+
+async def seed_table(conn, schema: str, size: str, force: bool) -> None:
+    rows = parse_size(size)
+    name = table_name(size)
+    exists = (await conn.execute(
+        text("SELECT to_regclass(:rel) IS NOT NULL"), {"rel": f'"{schema}"."{name}"'}
+    )).scalar_one()
+    if exists and not force:
+        count = (await conn.execute(text(f'SELECT count(*) FROM "{schema}"."{name}"'))).scalar_one()
+        if count == rows:
+            print(f"{schema}.{name}: {rows} rows already seeded")
+            return
+
+    start = time.perf_counter()
+    await conn.execute(text(f'DROP TABLE IF EXISTS "{schema}"."{name}"'))
+    await conn.execute(text(f'CREATE TABLE "{schema}"."{name}" AS {ITEMS_SELECT}'), {"rows": rows})
+    await conn.execute(text(f'ALTER TABLE "{schema}"."{name}" ADD PRIMARY KEY (id)'))
+    # Only created_at is indexed, so filters and sorts on other columns stay
+    # unindexed scans, like an unprepared production table.
+    await conn.execute(text(f'CREATE INDEX ON "{schema}"."{name}" (created_at)'))
+    await conn.commit()
+    # ANALYZE outside the load transaction so estimates match the data.
+    await conn.execute(text(f'ANALYZE "{schema}"."{name}"'))
+    await conn.commit()
+    print(f"{schema}.{name}: seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+async def seed(sizes: list[str], schema: str, force: bool, dsn: str = config.DATABASE_URL) -> None:
+    engine = create_async_engine(dsn)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            await conn.commit()
+            for size in sizes:
+                await seed_table(conn, schema, size, force)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10k,100k,1m")
+    parser.add_argument("--schema", default="bench")
+    parser.add_argument("--force", action="store_true", help="re-create tables that already exist")
+    args = parser.parse_args()
+    asyncio.run(seed(args.sizes.split(","), args.schema, args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+-- Event triggers that NOTIFY the API when table definitions change, so the
+-- in-process catalog cache is invalidated without waiting for its TTL.
+-- Requires superuser. Enable the listener with CATALOG_LISTEN_ENABLED=1;
+-- the channel name must match CATALOG_LISTEN_CHANNEL (default: catalog_changed).
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_ddl() RETURNS event_trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN SELECT object_identity FROM pg_event_trigger_ddl_commands() LOOP
+        PERFORM pg_notify('catalog_changed', r.object_identity);
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_drop() RETURNS event_trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN SELECT object_identity FROM pg_event_trigger_dropped_objects() LOOP
+        PERFORM pg_notify('catalog_changed', r.object_identity);
+    END LOOP;
+END;
+$$;
+
+DROP EVENT TRIGGER IF EXISTS catalog_changed_ddl;
+CREATE EVENT TRIGGER catalog_changed_ddl ON ddl_command_end
+    EXECUTE FUNCTION public.notify_catalog_ddl();
+
+DROP EVENT TRIGGER IF EXISTS catalog_changed_drop;
+CREATE EVENT TRIGGER catalog_changed_drop ON sql_drop
+    EXECUTE FUNCTION public.notify_catalog_drop();